@@ -0,0 +1,323 @@
+# actors.py
+
+import numpy as np
+from animation import CLOCK, AnimationBatch
+from assets import ASSETS
+from player import ACCELERATION, GRAVITY, MAX_FALL_SPEED, COLLISION_MARGIN
+from spatial import cell_key
+
+# Ёмкость пула по умолчанию: память выделяется один раз при создании
+DEFAULT_CAPACITY = 4096
+
+# Виды актёров
+ENEMY = 0   # ходит по платформам, разворачивается у стен и обрывов
+PICKUP = 1  # падает и лежит на платформе
+MOVER = 2   # летающая платформа: ходит туда-обратно в пределах patrol от точки появления
+
+KIND_NAMES = ("enemy", "pickup", "mover")
+KIND_SIZES = ((28, 28), (16, 16), (96, 16))
+KIND_COLORS = ((220, 50, 90), (255, 215, 0), (90, 90, 140))
+# Анимация вида: длительности кадров (мс) и зацикленность; кадры — оттенки KIND_COLORS
+KIND_ANIMATIONS = AnimationBatch([([300, 300], True), ([120] * 4, True), ([1000], True)])
+KIND_SPEED = np.array([2.0, 0.0, 1.5], dtype=np.float32)
+KIND_GRAVITY = np.array([True, True, False])
+KIND_COLLIDES = np.array([True, True, False])
+KIND_WIDTH = np.array([size[0] for size in KIND_SIZES], dtype=np.int32)
+KIND_HEIGHT = np.array([size[1] for size in KIND_SIZES], dtype=np.int32)
+
+# Биты флагов
+ON_GROUND = 1
+
+_FAR = np.iinfo(np.int32).max
+
+
+def kind_frames(color, size, count):
+    """Кадры-заглушки вида: цвет от приглушённого к полному."""
+    frames = []
+    for i in range(count):
+        k = 0.6 + 0.4 * i / max(1, count - 1)
+        frames.append(ASSETS.placeholder(tuple(int(c * k) for c in color), size))
+    return frames
+
+
+class ActorPool:
+    """Враги, подбираемые предметы и движущиеся платформы в виде структуры
+    массивов NumPy.
+
+    Как и ParticlePool, живые актёры лежат плотно в срезе [0, count);
+    update двигает всех сразу: разгон, гравитация и ограничение скорости
+    падения — как у Player, а столкновения с платформами проверяются одной
+    матрицей «актёры × платформы-кандидаты», собранной из ячеек
+    пространственного индекса под всеми актёрами. Индексы актёров не
+    постоянны: упавшие за death_y удаляются с уплотнением массивов.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, death_y=None):
+        self.capacity = capacity
+        self.death_y = death_y
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        # Положение на предыдущем тике — для интерполяции при отрисовке
+        self.prev_x = np.zeros(capacity, dtype=np.float32)
+        self.prev_y = np.zeros(capacity, dtype=np.float32)
+        self.vel_x = np.zeros(capacity, dtype=np.float32)
+        self.vel_y = np.zeros(capacity, dtype=np.float32)
+        self.home_x = np.zeros(capacity, dtype=np.float32)
+        self.patrol = np.zeros(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.flags = np.zeros(capacity, dtype=np.uint8)
+        # Момент начала анимации на общих часах
+        self.anim_start = np.zeros(capacity, dtype=np.float64)
+        self.sprites = None
+
+    def __len__(self):
+        return self.count
+
+    def columns(self):
+        """Все столбцы состояния в постоянном порядке (уплотнение, снимки состояния)."""
+        return (self.x, self.y, self.prev_x, self.prev_y, self.vel_x, self.vel_y,
+                self.home_x, self.patrol, self.kind, self.direction, self.flags,
+                self.anim_start)
+
+    def spawn(self, kind, x, y, direction=0, patrol=0.0):
+        """Добавляет актёра; возвращает его индекс или -1, если пул заполнен."""
+        i = self.count
+        if i >= self.capacity:
+            return -1
+        self.x[i] = self.prev_x[i] = self.home_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.vel_x[i] = 0
+        self.vel_y[i] = 0
+        self.patrol[i] = patrol
+        self.kind[i] = kind
+        self.direction[i] = direction
+        self.flags[i] = 0
+        self.anim_start[i] = CLOCK.time
+        self.count = i + 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def rects(self, idx=slice(None)):
+        """Целочисленные хитбоксы (left, top, width, height) — int() как у rect игрока."""
+        n = self.count
+        kind = self.kind[:n][idx]
+        left = np.trunc(self.x[:n][idx]).astype(np.int32)
+        top = np.trunc(self.y[:n][idx]).astype(np.int32)
+        return left, top, KIND_WIDTH[kind], KIND_HEIGHT[kind]
+
+    def overlapping(self, rect):
+        """Индексы актёров, чей хитбокс пересекает rect."""
+        left, top, width, height = self.rects()
+        hit = ((left < rect.right) & (left + width > rect.left)
+               & (top < rect.bottom) & (top + height > rect.top))
+        return np.flatnonzero(hit)
+
+    @staticmethod
+    def candidates(platforms, left, top, right, bottom):
+        """Пары «прямоугольник i — платформа из его ячеек» сразу для всех
+        прямоугольников (left, top, right, bottom): массив номеров i и столбцы
+        платформ pl, pt, pr, pb той же длины. Одна платформа может попасть
+        в пары с i несколько раз — для проверок пересечения это не важно."""
+        keys, starts, bounds = platforms.cell_table()
+        if len(keys) == 0:
+            # Пустой индекс (например, загружены только чанки над пропастью)
+            empty = np.zeros(0, dtype=np.int32)
+            return np.zeros(0, dtype=np.intp), empty, empty, empty, empty
+        cs = platforms.cell_size
+        x0 = (left - COLLISION_MARGIN) // cs
+        x1 = (right + COLLISION_MARGIN - 1) // cs
+        y0 = (top - COLLISION_MARGIN) // cs
+        y1 = (bottom + COLLISION_MARGIN - 1) // cs
+        # Актёры не больше ячейки, поэтому хватает ячеек четырёх углов
+        owner = np.tile(np.arange(len(left)), 4)
+        wanted = cell_key(np.concatenate((x0, x1, x0, x1)), np.concatenate((y0, y0, y1, y1)))
+        # Углы в одной ячейке дали бы одинаковые пары
+        wide, tall = x1 != x0, y1 != y0
+        unique = np.concatenate((np.ones(len(left), dtype=bool), wide, tall, wide & tall))
+        owner, wanted = owner[unique], wanted[unique]
+
+        pos = np.searchsorted(keys, wanted)
+        pos[pos == len(keys)] = 0
+        found = keys[pos] == wanted
+        first = starts[pos]
+        counts = np.where(found, starts[pos + 1] - first, 0)
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int32)
+            return np.zeros(0, dtype=np.intp), empty, empty, empty, empty
+        # Разворачиваем диапазоны [first, first + count) в плоский список записей
+        pair_owner = np.repeat(owner, counts)
+        offsets = np.cumsum(counts) - counts
+        entry = np.arange(total) - np.repeat(offsets - first, counts)
+        pl, pt, pr, pb = bounds[:, entry]
+        return pair_owner, pl, pt, pr, pb
+
+    def update(self, platforms, active=None):
+        """Один тик физики. platforms — SpatialHash уровня; active — пара (left, right):
+        актёры вне этой полосы (например, в невыгруженных чанках) стоят на месте."""
+        n = self.count
+        if n == 0:
+            return
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        if active is None:
+            idx = slice(0, n)  # срезы — представления, без копирования столбцов
+        else:
+            idx = np.flatnonzero((self.x[:n] >= active[0]) & (self.x[:n] < active[1]))
+            if len(idx) == 0:
+                return
+
+        kind = self.kind[idx]
+        direction = self.direction[idx]
+        x = self.x[idx]
+        y = self.y[idx]
+        vel_x = self.vel_x[idx]
+        vel_y = self.vel_y[idx]
+        width = KIND_WIDTH[kind]
+        height = KIND_HEIGHT[kind]
+
+        # Разгон к целевой скорости и гравитация — константы Player
+        vel_x += (direction * KIND_SPEED[kind] - vel_x) * ACCELERATION
+        falls = KIND_GRAVITY[kind]
+        vel_y[falls] += GRAVITY
+        np.minimum(vel_y, MAX_FALL_SPEED, out=vel_y)
+
+        x += vel_x
+        y += vel_y
+
+        collides = KIND_COLLIDES[kind]
+        on_ground = np.zeros(len(x), dtype=bool)
+        if collides.any():
+            c = np.flatnonzero(collides)
+            cw, ch = width[c], height[c]
+            left = np.trunc(self.prev_x[idx][c]).astype(np.int32)
+            top = np.trunc(self.prev_y[idx][c]).astype(np.int32)
+            new_left = np.trunc(x[c]).astype(np.int32)
+            new_top = np.trunc(y[c]).astype(np.int32)
+            pairs = self.candidates(
+                platforms,
+                np.minimum(left, new_left), np.minimum(top, new_top),
+                np.maximum(left, new_left) + cw, np.maximum(top, new_top) + ch)
+            if len(pairs[0]):
+                self.collide(c, x, y, vel_x, vel_y, direction, kind, cw, ch, pairs, on_ground)
+
+        # Летающие платформы разворачиваются на краях маршрута
+        movers = kind == MOVER
+        if movers.any():
+            offset = x - self.home_x[idx]
+            patrol = self.patrol[idx]
+            direction[movers & (offset > patrol)] = -1
+            direction[movers & (offset < -patrol)] = 1
+
+        if active is not None:
+            self.x[idx] = x
+            self.y[idx] = y
+            self.vel_x[idx] = vel_x
+            self.vel_y[idx] = vel_y
+            self.direction[idx] = direction
+        self.flags[idx] = np.where(on_ground, ON_GROUND, 0)
+
+        if self.death_y is not None:
+            self.remove(self.y[:n] <= self.death_y)
+
+    @staticmethod
+    def collide(c, x, y, vel_x, vel_y, direction, kind, width, height, pairs, on_ground):
+        """Столкновения подмножества c по осям, как check_collisions у игрока:
+        сначала по X, затем по Y; упор в стену разворачивает врага.
+        pairs — кандидаты из candidates(), номера в них — позиции внутри c."""
+        owner, pl, pt, pr, pb = pairs
+        m = len(c)
+        pw, ph = width[owner], height[owner]
+
+        # По горизонтали: после сдвига по X, со старым Y
+        left = np.trunc(x[c]).astype(np.int32)
+        top = np.trunc(y[c] - vel_y[c]).astype(np.int32)
+        touching = ActorPool.touching(left, top, pw, ph, owner, pairs)
+        hit = np.zeros(m, dtype=bool)
+        hit[owner[touching]] = True
+        if hit.any():
+            stop_right = np.full(m, _FAR, dtype=np.int32)
+            stop_left = np.full(m, -_FAR, dtype=np.int32)
+            np.minimum.at(stop_right, owner[touching], pl[touching])
+            np.maximum.at(stop_left, owner[touching], pr[touching])
+            vx = vel_x[c]
+            resolved = np.where(vx > 0, stop_right - width, np.where(vx < 0, stop_left, left))
+            x[c[hit]] = resolved[hit]
+            vel_x[c[hit]] = 0
+            turn = c[hit & (kind[c] == ENEMY)]
+            direction[turn] = -direction[turn]
+
+        # По вертикали: с уже исправленным X
+        left = np.trunc(x[c]).astype(np.int32)
+        top = np.trunc(y[c]).astype(np.int32)
+        touching = ActorPool.touching(left, top, pw, ph, owner, pairs)
+        hit = np.zeros(m, dtype=bool)
+        hit[owner[touching]] = True
+        if hit.any():
+            stop_down = np.full(m, _FAR, dtype=np.int32)
+            stop_up = np.full(m, -_FAR, dtype=np.int32)
+            np.minimum.at(stop_down, owner[touching], pt[touching])
+            np.maximum.at(stop_up, owner[touching], pb[touching])
+            vy = vel_y[c]
+            resolved = np.where(vy > 0, stop_down - height, np.where(vy < 0, stop_up, top))
+            y[c[hit]] = resolved[hit]
+            vel_y[c[hit]] = 0
+            on_ground[c[hit & (vy > 0)]] = True
+
+        # Враг на земле разворачивается, если под передним краем пусто
+        walking = on_ground[c] & (kind[c] == ENEMY)
+        if walking.any():
+            left = np.trunc(x[c]).astype(np.int32)
+            probe_x = np.where(direction[c] > 0, left + width, left - 1)[owner]
+            probe_y = (np.trunc(y[c]).astype(np.int32) + height)[owner]
+            under = (probe_x >= pl) & (probe_x < pr) & (probe_y >= pt) & (probe_y < pb)
+            supported = np.zeros(m, dtype=bool)
+            supported[owner[under]] = True
+            edge = c[walking & ~supported]
+            direction[edge] = -direction[edge]
+
+    @staticmethod
+    def touching(left, top, width, height, owner, pairs):
+        """Маска пар, в которых хитбокс (left, top) пересекает платформу."""
+        _, pl, pt, pr, pb = pairs
+        left, top = left[owner], top[owner]
+        return (left < pr) & (left + width > pl) & (top < pb) & (top + height > pt)
+
+    def remove(self, keep):
+        """Оставляет актёров с keep[i] == True, уплотняя массивы на месте."""
+        n = self.count
+        live = int(np.count_nonzero(keep))
+        if live == n:
+            return
+        for column in self.columns():
+            column[:live] = column[:n][keep]
+        self.count = live
+
+    def draw(self, screen, camera, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return
+        if self.sprites is None:
+            self.sprites = [kind_frames(color, size, KIND_ANIMATIONS.last[kind] + 1)
+                            for kind, (color, size) in enumerate(zip(KIND_COLORS, KIND_SIZES))]
+
+        # Интерполяция между тиками, int() как у игрока
+        x = np.trunc(self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha) - camera.x
+        y = np.trunc(self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha) - camera.y
+        kind = self.kind[:n]
+        width, height = screen.get_size()
+        visible = ((x + KIND_WIDTH[kind] > 0) & (x < width)
+                   & (y + KIND_HEIGHT[kind] > 0) & (y < height))
+        if not visible.any():
+            return
+
+        # Кадры всех видимых актёров — одним вызовом
+        kind = kind[visible]
+        frame = KIND_ANIMATIONS.frame_indices(kind, self.anim_start[:n][visible])
+        sprites = self.sprites
+        screen.blits([(sprites[k][f], (px, py)) for k, f, px, py in
+                      zip(kind.tolist(), frame.tolist(), x[visible].tolist(), y[visible].tolist())], False)
\ No newline at end of file
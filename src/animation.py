@@ -1,32 +1,101 @@
 # animation.py
 
 import pygame
-import os
+import numpy as np
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class AnimationClock:
+    """Общие часы анимаций: время копится из dt тиков симуляции, а не берётся
+    у pygame.time, поэтому анимации работают без окна, замирают на паузе и
+    ускоряются вместе с перемоткой. scale — множитель времени (0 — стоп)."""
+
+    def __init__(self):
+        self.time = 0.0  # мс
+        self.scale = 1.0
+
+    def tick(self, dt_ms):
+        self.time += dt_ms * self.scale
+
+    def reset(self):
+        self.time = 0.0
+
+
+# Часы по умолчанию; их двигает Level.update раз в тик
+CLOCK = AnimationClock()
+
 
 class Animation:
-    def __init__(self, frames, frame_duration=100, loop=True):
+    """Анимация по расписанию кадров: номер кадра вычисляется из времени,
+    прошедшего на часах с reset(), поэтому экземпляр ничего не обновляет
+    сам. frame_duration — мс на кадр или список длительностей по кадрам."""
+
+    def __init__(self, frames, frame_duration=100, loop=True, flipped_frames=None, clock=CLOCK):
+        # Кадры не копируются: это ссылки на общий кеш спрайтов (assets.py)
         self.frames = frames
+        if flipped_frames is None:
+            flipped_frames = [pygame.transform.flip(frame, True, False) for frame in frames]
+        self.flipped_frames = flipped_frames
+        if isinstance(frame_duration, (int, float)):
+            frame_duration = [frame_duration] * len(frames)
         self.frame_duration = frame_duration
+        # Моменты окончания кадров от начала анимации
+        self.schedule = list(accumulate(frame_duration))
+        self.total = self.schedule[-1]
         self.loop = loop
-        self.current_frame = 0
-        self.last_update = 0
-        self.finished = False
-
-    def update(self, dt_ms):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_duration:
-            self.last_update = now
-            self.current_frame += 1
-            if self.current_frame >= len(self.frames):
-                if self.loop:
-                    self.current_frame = 0
-                else:
-                    self.current_frame = len(self.frames) - 1
-                    self.finished = True
-
-    def get_current_frame(self):
+        self.clock = clock
+        self.start = clock.time
+
+    def frame_at(self, elapsed):
+        """Номер кадра через elapsed мс после начала."""
+        if self.loop:
+            elapsed %= self.total
+        elif elapsed >= self.total:
+            return len(self.frames) - 1
+        return bisect_right(self.schedule, elapsed)
+
+    @property
+    def current_frame(self):
+        return self.frame_at(self.clock.time - self.start)
+
+    @property
+    def finished(self):
+        return not self.loop and self.clock.time - self.start >= self.total
+
+    def get_current_frame(self, flipped=False):
+        if flipped:
+            return self.flipped_frames[self.current_frame]
         return self.frames[self.current_frame]
 
     def reset(self):
-        self.current_frame = 0
-        self.finished = False
\ No newline at end of file
+        self.start = self.clock.time
+
+
+class AnimationBatch:
+    """Номера кадров для множества объектов одним вызовом.
+
+    animations — список Animation (или пар (длительности, loop)); объект
+    задаётся номером анимации в списке и моментом её начала на часах.
+    """
+
+    def __init__(self, animations, clock=CLOCK):
+        self.clock = clock
+        specs = [(anim.frame_duration, anim.loop) if isinstance(anim, Animation) else anim
+                 for anim in animations]
+        width = max(len(durations) for durations, _ in specs)
+        # Расписания, дополненные бесконечностью до одной длины
+        self.schedule = np.full((len(specs), width), np.inf)
+        for i, (durations, _) in enumerate(specs):
+            self.schedule[i, :len(durations)] = list(accumulate(durations))
+        self.total = np.array([sum(durations) for durations, _ in specs], dtype=np.float64)
+        self.loop = np.array([loop for _, loop in specs])
+        self.last = np.array([len(durations) - 1 for durations, _ in specs])
+
+    def frame_indices(self, anim_ids, starts):
+        """anim_ids, starts — массивы NumPy одной длины; возвращает номера кадров."""
+        elapsed = self.clock.time - starts
+        total = self.total[anim_ids]
+        elapsed = np.where(self.loop[anim_ids], np.mod(elapsed, total), elapsed)
+        index = (elapsed[:, None] >= self.schedule[anim_ids]).sum(axis=1)
+        return np.minimum(index, self.last[anim_ids])
\ No newline at end of file
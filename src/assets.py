@@ -0,0 +1,307 @@
+# assets.py
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import pygame
+from concurrent.futures import ThreadPoolExecutor
+
+SPRITE_ROOT = "assets/sprites"
+
+# Явно объявленный размер кадра для папок со спрайт-листами (путь относительно SPRITE_ROOT)
+FRAME_SIZES = {
+    os.path.join("effects", "dust"): (16, 16),
+}
+# Иначе размер кадра берётся из имени файла: "Fall (32x32).png"
+SHEET_NAME = re.compile(r"\((\d+)x(\d+)\)")
+
+ATLAS_WIDTH = 512
+
+# Пакет спрайтов (bundle.py): готовый атлас одним файлом
+BUNDLE_PATH = "assets/sprites.bundle"
+BUNDLE_MAGIC = b"PFAB"
+BUNDLE_VERSION = 1
+# magic, версия, ширина и высота атласа, отпечаток исходных PNG, длина индекса
+BUNDLE_HEADER = struct.Struct("<4sBHH20sI")
+# Пиксели начинаются с границы страницы
+BUNDLE_ALIGN = 4096
+# Порядок байтов пикселей в пакете: совпадает с форматом convert_alpha() на
+# обычных little-endian дисплеях, поэтому поверхность не приходится конвертировать
+BUNDLE_FORMAT = "BGRA"
+
+
+def display_ready():
+    """convert()/convert_alpha() работают только при открытом окне."""
+    return pygame.display.get_surface() is not None
+
+
+def frame_size_for(folder, filename, image_size):
+    """Размер одного кадра в файле: объявленный для папки, из имени файла или вся картинка."""
+    if folder in FRAME_SIZES:
+        return FRAME_SIZES[folder]
+    match = SHEET_NAME.search(filename)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    return image_size
+
+
+def slice_sheet(image_size, frame_size):
+    """Прямоугольники кадров спрайт-листа: слева направо, сверху вниз."""
+    width, height = image_size
+    frame_w, frame_h = frame_size
+    rects = []
+    for y in range(0, height - frame_h + 1, frame_h):
+        for x in range(0, width - frame_w + 1, frame_w):
+            rects.append(pygame.Rect(x, y, frame_w, frame_h))
+    return rects
+
+
+class TextureAtlas:
+    """Все кадры в одной поверхности. Упаковка полками: кадры по убыванию высоты
+    выкладываются в ряды шириной ATLAS_WIDTH. Кадр шире атласа не поместится
+    ни в один ряд — это ValueError, а не молча обрезанный спрайт."""
+
+    def __init__(self, images, width=ATLAS_WIDTH):
+        # images: список поверхностей-кадров; rects[i] — место i-го кадра в атласе
+        for image in images:
+            if image.get_width() > width:
+                raise ValueError(f"кадр {image.get_width()}x{image.get_height()} шире атласа ({width} px)")
+        self.rects = [None] * len(images)
+        order = sorted(range(len(images)), key=lambda i: -images[i].get_height())
+        x = y = shelf_h = 0
+        for i in order:
+            w, h = images[i].get_size()
+            if x + w > width:
+                x, y = 0, y + shelf_h
+                shelf_h = 0
+            self.rects[i] = pygame.Rect(x, y, w, h)
+            x += w
+            shelf_h = max(shelf_h, h)
+
+        self.surface = pygame.Surface((width, max(1, y + shelf_h)), pygame.SRCALPHA)
+        for image, rect in zip(images, self.rects):
+            self.surface.blit(image, rect)
+        if display_ready():
+            self.surface = self.surface.convert_alpha()
+
+    @classmethod
+    def from_surface(cls, surface, rects):
+        """Уже упакованный атлас (из пакета спрайтов)."""
+        atlas = cls.__new__(cls)
+        atlas.surface = surface
+        atlas.rects = rects
+        return atlas
+
+    def frames(self):
+        """Кадры как подповерхности атласа (общая память, без копий)."""
+        return [self.surface.subsurface(rect) for rect in self.rects]
+
+
+class AssetManager:
+    """Общий на весь процесс кеш спрайтов.
+
+    Все кадры из SPRITE_ROOT (спрайт-листы режутся по объявленному размеру
+    кадра) вместе с зеркальными копиями упаковываются в один атлас при
+    первом обращении. Animation получает подповерхности атласа, так что
+    рестарт не трогает диск, а поворот влево не вызывает transform.flip.
+    Если рядом лежит собранный из тех же файлов пакет (bundle.py), атлас
+    берётся из него без декодирования PNG.
+    """
+
+    def __init__(self, root=SPRITE_ROOT, bundle_path=BUNDLE_PATH):
+        self.root = root
+        self.bundle_path = bundle_path
+        self.bundle = None
+        self.atlas = None
+        self.atlas_converted = False
+        self.folders = {}
+        # [(папка относительно root, число кадров)] в порядке кадров атласа
+        self.folder_counts = []
+        self.placeholders = {}
+
+    def scan(self):
+        """Пути всех .png под root в порядке папок и имён файлов."""
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for file in sorted(filenames):
+                if file.endswith('.png'):
+                    paths.append(os.path.join(dirpath, file))
+        return paths
+
+    def pack(self, sheets):
+        """sheets: [(путь, загруженная картинка)] из scan(). Режет листы на кадры и
+        пакует их вместе с зеркальными копиями в атлас. Только в главном потоке."""
+        folders = []
+        images = []
+        for path, sheet in sheets:
+            dirpath, file = os.path.split(path)
+            dirpath = os.path.normpath(dirpath)
+            folder = os.path.relpath(dirpath, self.root)
+            frame_size = frame_size_for(folder, file, sheet.get_size())
+            for rect in slice_sheet(sheet.get_size(), frame_size):
+                frame = sheet.subsurface(rect)
+                images.append(frame)
+                images.append(pygame.transform.flip(frame, True, False))
+                if folders and folders[-1][0] == dirpath:
+                    folders[-1][1] += 1
+                else:
+                    folders.append([dirpath, 1])
+
+        self.atlas = TextureAtlas(images)
+        self.atlas_converted = display_ready()
+        self.split_frames([(os.path.relpath(path, self.root), count) for path, count in folders])
+
+    def split_frames(self, folder_counts):
+        """Раздаёт кадры атласа по папкам: в атласе кадр и его зеркальная копия идут парами."""
+        frames = self.atlas.frames()
+        self.folder_counts = folder_counts
+        self.folders = {}
+        start = 0
+        for folder, count in folder_counts:
+            chunk = frames[start:start + count * 2]
+            self.folders[os.path.normpath(os.path.join(self.root, folder))] = (chunk[0::2], chunk[1::2])
+            start += count * 2
+
+    def build_atlas(self):
+        """Синхронная загрузка всего атласа (см. AssetLoader для фоновой)."""
+        if not self.load_bundle():
+            self.pack([(path, pygame.image.load(path)) for path in self.scan()])
+
+    def digest(self, paths):
+        """Отпечаток набора PNG по путям, размерам и времени изменения — без чтения файлов."""
+        sha = hashlib.sha1()
+        for path in paths:
+            stat = os.stat(path)
+            sha.update(f"{os.path.relpath(path, self.root)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return sha.digest()
+
+    def save_bundle(self):
+        """Собирает атлас из PNG и пишет пакет: заголовок, индекс (JSON) и пиксели
+        атласа в BUNDLE_FORMAT с границы BUNDLE_ALIGN. Возвращает число кадров."""
+        paths = self.scan()
+        self.pack([(path, pygame.image.load(path)) for path in paths])
+        surface = self.atlas.surface
+        index = json.dumps({
+            "folders": self.folder_counts,
+            "rects": [list(rect) for rect in self.atlas.rects],
+        }, separators=(",", ":")).encode()
+        header = BUNDLE_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, *surface.get_size(),
+                                    self.digest(paths), len(index))
+        padding = -(len(header) + len(index)) % BUNDLE_ALIGN
+        with open(self.bundle_path, "wb") as f:
+            f.write(header)
+            f.write(index)
+            f.write(bytes(padding))
+            f.write(pygame.image.tobytes(surface, BUNDLE_FORMAT))
+        return sum(count for _, count in self.folder_counts)
+
+    def load_bundle(self):
+        """Атлас из пакета: файл отображается в память, и поверхность атласа
+        создаётся прямо поверх отображения (frombuffer), без декодирования и
+        копирования пикселей. False, если пакета нет или он собран не из
+        текущих PNG под root (если PNG нет совсем, пакету верим)."""
+        try:
+            with open(self.bundle_path, "rb") as f:
+                # ACCESS_COPY: страницы читаются с диска по мере надобности,
+                # а случайная запись в кадр не дойдёт до файла
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return False
+        if len(data) < BUNDLE_HEADER.size:
+            return False
+        magic, version, width, height, digest, index_size = BUNDLE_HEADER.unpack_from(data)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            return False
+        paths = self.scan()
+        if paths and digest != self.digest(paths):
+            return False
+        start = BUNDLE_HEADER.size
+        index = json.loads(data[start:start + index_size])
+        start += index_size
+        start += -start % BUNDLE_ALIGN
+        size = width * height * 4
+        if len(data) < start + size:
+            return False
+
+        surface = pygame.image.frombuffer(memoryview(data)[start:start + size], (width, height), BUNDLE_FORMAT)
+        converted = display_ready()
+        if converted and surface.get_masks() != pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha().get_masks():
+            # Дисплей в другом формате: одна копия при загрузке вместо конверсии на каждом blit
+            surface = surface.convert_alpha()
+        # Отображение живёт, пока на него ссылаются поверхности
+        self.bundle = data
+        self.atlas = TextureAtlas.from_surface(surface, [pygame.Rect(rect) for rect in index["rects"]])
+        self.atlas_converted = converted
+        self.split_frames([(folder, count) for folder, count in index["folders"]])
+        return True
+
+    def folder(self, path):
+        """Кадры папки по алфавиту файлов: (кадры, зеркальные кадры). Пустые списки, если кадров нет."""
+        if self.atlas is None or (not self.atlas_converted and display_ready()):
+            self.build_atlas()
+        return self.folders.get(os.path.normpath(path), ([], []))
+
+    def placeholder(self, color, size):
+        """Цветной прямоугольник-заглушка вместо отсутствующего спрайта."""
+        key = (color, size)
+        surf = self.placeholders.get(key)
+        if surf is None:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surf, color, (0, 0, *size))
+            self.placeholders[key] = surf
+        return surf
+
+    def clear(self):
+        self.atlas = None
+        self.bundle = None
+        self.folders.clear()
+        self.placeholders.clear()
+
+
+# Единственный экземпляр на процесс
+ASSETS = AssetManager()
+
+
+class AssetLoader:
+    """Фоновая загрузка атласа: PNG декодируются в пуле потоков, пока на экране
+    уже меню; упаковка и convert_alpha выполняются потом в главном потоке (finish).
+    Если есть актуальный пакет спрайтов, атлас берётся из него сразу в start()."""
+
+    def __init__(self, manager=ASSETS, workers=4):
+        self.manager = manager
+        self.workers = workers
+        self.pool = None
+        self.paths = []
+        self.futures = []
+        self.finished = False
+
+    def start(self):
+        if self.manager.load_bundle():
+            self.finished = True
+            return
+        self.paths = self.manager.scan()
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.futures = [self.pool.submit(pygame.image.load, path) for path in self.paths]
+
+    @property
+    def progress(self):
+        """Доля декодированных файлов, от 0 до 1."""
+        if self.finished or not self.futures:
+            return 1.0
+        return sum(future.done() for future in self.futures) / len(self.futures)
+
+    @property
+    def ready(self):
+        return all(future.done() for future in self.futures)
+
+    def finish(self):
+        """Дожидается декодирования (если оно ещё идёт) и собирает атлас."""
+        if self.finished:
+            return
+        sheets = [(path, future.result()) for path, future in zip(self.paths, self.futures)]
+        self.pool.shutdown()
+        self.manager.pack(sheets)
+        self.finished = True
\ No newline at end of file
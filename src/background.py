@@ -0,0 +1,83 @@
+# background.py
+import pygame
+from quality import QUALITY
+
+# Цвет-ключ прозрачности для запечённых слоёв (в самих слоях не встречается)
+COLORKEY = (255, 0, 255)
+
+# Здания-силуэты на заднем плане (x, y, ширина, высота)
+BUILDINGS = [
+    (-100, 400, 100, 200),
+    (1700, 380, 120, 220),
+    (300, 480, 80, 120),
+    (600, 450, 90, 150),
+    (1000, 470, 100, 130),
+]
+BUILDING_COLORS = [(20, 20, 35), (25, 25, 40)]
+
+
+class ParallaxLayer:
+    """Запечённая полоса фона, которая сдвигается вслед за камерой с коэффициентом factor."""
+
+    def __init__(self, rects, colors, factor):
+        self.rects = rects
+        self.colors = colors
+        self.factor = factor
+        self.surface = None
+        self.origin_x = 0
+
+    def bake(self, template, height):
+        min_x = min(x for x, _, _, _ in self.rects)
+        max_x = max(x + w for x, _, w, _ in self.rects)
+        self.origin_x = min_x
+        self.surface = pygame.Surface((max_x - min_x, height), 0, template)
+        self.surface.fill(COLORKEY)
+        # Цвет каждого здания фиксирован по индексу — без мерцания между кадрами
+        for i, (x, y, w, h) in enumerate(self.rects):
+            color = self.colors[i % len(self.colors)]
+            pygame.draw.rect(self.surface, color, (x - min_x, y, w, h))
+        self.surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+
+    def draw(self, screen, camera):
+        screen_x = self.origin_x - camera.x * self.factor
+        if screen_x < screen.get_width() and screen_x + self.surface.get_width() > 0:
+            screen.blit(self.surface, (int(screen_x), 0))
+
+
+class Background:
+    """Небо с градиентом и слоями параллакса. Всё рисуется один раз и пересобирается только при смене размера экрана."""
+
+    def __init__(self):
+        self.size = None
+        self.sky = None
+        self.layers = [ParallaxLayer(BUILDINGS, BUILDING_COLORS, 0.3)]
+
+    def bake(self, screen):
+        width, height = screen.get_size()
+        self.size = (width, height)
+
+        # Градиент: от чёрного (внизу) к тёмно-синему (вверху).
+        # По горизонтали он однороден, поэтому параллакс неба не нужен.
+        self.sky = pygame.Surface((width, height), 0, screen)
+        for y in range(height):
+            t = y / height
+            r = int(5 * (1 - t))
+            g = int(5 * (1 - t))
+            b = int(20 + 10 * (1 - t))
+            pygame.draw.line(self.sky, (r, g, b), (0, y), (width, y))
+
+        for layer in self.layers:
+            layer.bake(screen, height)
+
+    def draw_sky(self, screen):
+        if self.size != screen.get_size():
+            self.bake(screen)
+        screen.blit(self.sky, (0, 0))
+
+    def draw_layers(self, screen, camera):
+        if self.size != screen.get_size():
+            self.bake(screen)
+        # На низком качестве дальние слои не рисуются
+        count = QUALITY.settings.parallax_layers
+        for layer in self.layers[:count]:
+            layer.draw(screen, camera)
\ No newline at end of file
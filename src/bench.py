@@ -0,0 +1,229 @@
+# bench.py
+"""Бенчмарк кадра: время каждого этапа (физика, фон, актёры, игрок, частицы, HUD) по сценариям.
+
+Работает через dummy-драйвер SDL, окно не нужно. Запуск из корня проекта:
+    python src/bench.py                       # все сценарии
+    python src/bench.py --save baseline.json  # сохранить базу
+    python src/bench.py --compare baseline.json --threshold 0.15
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import sys
+import time
+import pygame
+from actors import ENEMY, PICKUP, MOVER
+from controls import InputState, ScriptedInput, NO_INPUT
+from level import Level
+from navgraph import NavGraph
+from neon import NeonLights, NEON_COLORS
+from player import Player
+from spatial import SpatialHash
+from textcache import get_font
+from timestep import SIM_DT_MS
+
+SCREEN_SIZE = (800, 600)
+SETTLE_TICKS = 10  # игрок появляется чуть внутри земли — даём ему встать
+
+
+class StageTimer:
+    """Подменяет метод объекта обёрткой, которая копит время вызовов за кадр.
+
+    Время вложенных обёрнутых вызовов (particles.update внутри player.update)
+    засчитывается только внутренней стадии, так что стадии не перекрываются.
+    """
+
+    def __init__(self):
+        self.current = {}
+        self.frames = {}
+        # Время, проведённое во вложенных стадиях, для каждого открытого вызова
+        self.nested = [0.0]
+
+    def wrap(self, obj, method, stage):
+        original = getattr(obj, method)
+
+        def timed(*args, **kwargs):
+            self.nested.append(0.0)
+            start = time.perf_counter()
+            result = original(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            inner = self.nested.pop()
+            self.nested[-1] += elapsed
+            self.current[stage] = self.current.get(stage, 0.0) + elapsed - inner
+            return result
+
+        setattr(obj, method, timed)
+
+    def end_frame(self, frame_seconds):
+        self.current["frame"] = frame_seconds
+        for stage, seconds in self.current.items():
+            self.frames.setdefault(stage, []).append(seconds * 1000.0)
+        self.current = {}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(frames):
+    return {
+        stage: {"mean_ms": sum(values) / len(values), "p99_ms": percentile(values, 0.99)}
+        for stage, values in frames.items()
+    }
+
+
+# === Сценарии ===
+
+def script_idle():
+    return [NO_INPUT]
+
+
+def script_run():
+    """Бег туда-обратно по земле: пыль из-под ног."""
+    states = []
+    for right in (True, False):
+        states += [InputState(not right, right, False, False, False, False)] * 90
+    return states
+
+
+def script_wall_jumps():
+    """Прыжки у правой башни с удержанием «вправо»: прыжок, двойной прыжок
+    и отскок от стены (искры) короткими нажатиями, затем пауза на земле."""
+    states = []
+    for i in range(40):
+        states.append(InputState(False, True, False, False, i < 12 and i % 4 < 2, False))
+    return states
+
+
+def make_large_level(platform_count, light_count, seed=0):
+    """Синтетический длинный уровень: ряд платформ над землёй и россыпь огней."""
+    rng = random.Random(seed)
+    level = Level()
+    width = platform_count * 60
+    platforms = [pygame.Rect(0, 540, width, 60)]
+    for i in range(platform_count):
+        platforms.append(pygame.Rect(i * 60 + rng.randint(0, 20), rng.randint(100, 480),
+                                     rng.randint(30, 120), rng.randint(20, 40)))
+    level.platforms = platforms
+    level.platform_index = SpatialHash(platforms)
+    level.nav = NavGraph(level.platform_index)
+    level.neon_lights = [
+        (rng.randint(0, width), rng.randint(100, 500), rng.choice(NEON_COLORS), rng.uniform(0.5, 2.0))
+        for _ in range(light_count)
+    ]
+    level.neon = NeonLights(level.neon_lights)
+    return level
+
+
+def make_crowd_level(actor_count, seed=0):
+    """Длинный уровень, заполненный врагами, предметами и летающими платформами."""
+    rng = random.Random(seed)
+    level = make_large_level(2000, 500, seed)
+    width = 2000 * 60
+    for i in range(actor_count):
+        kind = rng.choice((ENEMY, ENEMY, ENEMY, PICKUP, MOVER))
+        level.actors.spawn(kind, rng.randint(0, width), rng.randint(0, 450),
+                           direction=rng.choice((-1, 1)), patrol=rng.randint(50, 200))
+    return level
+
+
+SCENARIOS = {
+    "idle": (script_idle, None, None),
+    "run_dust": (script_run, None, None),
+    "wall_jumps": (script_wall_jumps, None, (1360, 492)),
+    "large_level": (script_run, lambda: make_large_level(20000, 5000), None),
+    "crowd": (script_run, lambda: make_crowd_level(4000), None),
+}
+
+
+def run_scenario(name, screen, font, frames):
+    from main import Camera, HUD
+
+    make_script, make_level, spawn = SCENARIOS[name]
+    random.seed(0)
+    level = make_level() if make_level else Level()
+    spawn_x, spawn_y = spawn if spawn else level.spawn_point()
+    states = [NO_INPUT] * SETTLE_TICKS + make_script()
+    player = Player(spawn_x, spawn_y, ScriptedInput(states, loop=True))
+    camera = Camera(*SCREEN_SIZE)
+    hud = HUD(screen, font, player, 0)
+
+    timer = StageTimer()
+    timer.wrap(player, "update", "player_update")
+    timer.wrap(player.particles, "update", "particles_update")
+    timer.wrap(player.particles, "draw", "particles_draw")
+    timer.wrap(level, "draw", "level_draw")
+    timer.wrap(level.actors, "update", "actors_update")
+    timer.wrap(level.actors, "draw", "actors_draw")
+    timer.wrap(player, "draw", "player_draw")
+    timer.wrap(hud, "draw", "hud_draw")
+
+    for _ in range(frames):
+        start = time.perf_counter()
+        player.update(level.platform_index, SIM_DT_MS)
+        level.update(SIM_DT_MS)
+        camera.update(player)
+        screen.fill((0, 0, 0))
+        level.draw(screen, camera)
+        level.actors.draw(screen, camera)
+        player.draw(screen, camera)
+        hud.draw()
+        timer.end_frame(time.perf_counter() - start)
+    return summarize(timer.frames)
+
+
+def compare(results, baseline, threshold):
+    """Печатает этапы, ставшие медленнее базы больше чем на threshold; возвращает их число."""
+    regressions = 0
+    for scenario, stages in results.items():
+        for stage, stats in stages.items():
+            base = baseline.get(scenario, {}).get(stage)
+            if not base:
+                continue
+            for key in ("mean_ms", "p99_ms"):
+                if base[key] > 0 and stats[key] > base[key] * (1 + threshold):
+                    regressions += 1
+                    print(f"REGRESSION {scenario}/{stage} {key}: "
+                          f"{base[key]:.3f} -> {stats[key]:.3f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов кадра")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), help="какие сценарии запускать")
+    parser.add_argument("--frames", type=int, default=600, help="кадров на сценарий")
+    parser.add_argument("--save", metavar="PATH", help="сохранить результаты в JSON")
+    parser.add_argument("--compare", metavar="PATH", help="сравнить с сохранённой базой")
+    parser.add_argument("--threshold", type=float, default=0.10, help="допустимое замедление (доля)")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    font = get_font(None, 36)
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = run_scenario(name, screen, font, args.frames)
+        print(f"== {name}")
+        for stage, stats in results[name].items():
+            print(f"  {stage:18s} mean {stats['mean_ms']:7.3f} ms   p99 {stats['p99_ms']:7.3f} ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    pygame.quit()
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
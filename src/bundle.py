@@ -0,0 +1,36 @@
+# bundle.py
+"""Сборка пакета спрайтов: все кадры из assets/sprites, уже разрезанные и
+упакованные в атлас вместе с зеркальными копиями, пишутся в один файл с
+индексом. Игра отображает его в память (AssetManager.load_bundle) вместо
+того, чтобы открывать и декодировать каждый PNG. Пакет действует, пока
+PNG не менялись; после правки спрайтов его нужно пересобрать, иначе игра
+молча вернётся к загрузке из PNG.
+
+Пример (из корня проекта):
+    python src/bundle.py
+"""
+import argparse
+import os
+import time
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from assets import AssetManager, SPRITE_ROOT, BUNDLE_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сборка пакета спрайтов")
+    parser.add_argument("--root", default=SPRITE_ROOT, help="папка со спрайтами")
+    parser.add_argument("--output", default=BUNDLE_PATH, help="файл пакета")
+    args = parser.parse_args()
+
+    manager = AssetManager(args.root, args.output)
+    start = time.perf_counter()
+    frames = manager.save_bundle()
+    elapsed = time.perf_counter() - start
+    width, height = manager.atlas.surface.get_size()
+    print(f"{args.output}: {frames} кадров, атлас {width}x{height}, "
+          f"{os.path.getsize(args.output) / 1024:.0f} КБ за {elapsed:.2f} с")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
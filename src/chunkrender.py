@@ -0,0 +1,96 @@
+# chunkrender.py
+import math
+import pygame
+from collections import OrderedDict
+from background import COLORKEY
+
+PLATFORM_COLOR = (35, 35, 50)
+EDGE_COLORS = [(80, 40, 120), (40, 100, 150), (120, 60, 80)]
+DECOR_COLOR = (28, 28, 45)
+
+TILE_SIZE = 512
+DEFAULT_BUDGET_BYTES = 16 * 1024 * 1024
+
+
+def edge_color(rect):
+    """Неоновая кромка платформы: выбирается по её координатам, поэтому не мерцает
+    и одинакова после перезагрузки чанка."""
+    key = (rect.x * 73856093) ^ (rect.y * 19349663) ^ (rect.width * 83492791) ^ rect.height
+    return EDGE_COLORS[key % len(EDGE_COLORS)]
+
+
+class ChunkRenderer:
+    """Статичная геометрия уровня (платформы и декор), запечённая в плитки.
+
+    Плитки TILE_SIZE x TILE_SIZE рисуются по ключу (cx, cy) при первом
+    попадании в кадр; за кадр выводятся только плитки под камерой. Когда
+    память плиток превышает budget_bytes, выбрасываются давно не
+    использованные.
+    """
+
+    def __init__(self, tile_size=TILE_SIZE, budget_bytes=DEFAULT_BUDGET_BYTES):
+        self.tile_size = tile_size
+        self.budget_bytes = budget_bytes
+        self.tiles = OrderedDict()
+        self.bytes = 0
+
+    def invalidate(self, rect=None):
+        """Сбрасывает плитки, задевающие rect (или все), — после изменения геометрии."""
+        if rect is None:
+            self.tiles.clear()
+            self.bytes = 0
+            return
+        ts = self.tile_size
+        for cx in range(rect.left // ts, (rect.right - 1) // ts + 1):
+            for cy in range(rect.top // ts, (rect.bottom - 1) // ts + 1):
+                tile = self.tiles.pop((cx, cy), None)
+                if tile is not None:
+                    self.bytes -= self.tile_bytes(tile)
+
+    @staticmethod
+    def tile_bytes(tile):
+        return tile.get_width() * tile.get_height() * tile.get_bytesize()
+
+    def render_tile(self, key, template, level):
+        ts = self.tile_size
+        origin_x, origin_y = key[0] * ts, key[1] * ts
+        area = pygame.Rect(origin_x, origin_y, ts, ts)
+        tile = pygame.Surface((ts, ts), 0, template)
+        tile.fill(COLORKEY)
+
+        for rect in level.decor_index.query(area):
+            pygame.draw.rect(tile, DECOR_COLOR, rect.move(-origin_x, -origin_y))
+        for plat in level.platform_index.query(area):
+            local = plat.move(-origin_x, -origin_y)
+            # Тёмно-серый с неоновой кромкой
+            pygame.draw.rect(tile, PLATFORM_COLOR, local)
+            pygame.draw.rect(tile, edge_color(plat), local, 2)
+
+        tile.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return tile
+
+    def draw(self, screen, camera, level):
+        ts = self.tile_size
+        width, height = screen.get_size()
+        left = math.floor(camera.x)
+        top = math.floor(camera.y)
+        tiles = self.tiles
+
+        batch = []
+        for cx in range(left // ts, (left + width) // ts + 1):
+            for cy in range(top // ts, (top + height) // ts + 1):
+                key = (cx, cy)
+                tile = tiles.get(key)
+                if tile is None:
+                    tile = self.render_tile(key, screen, level)
+                    tiles[key] = tile
+                    self.bytes += self.tile_bytes(tile)
+                else:
+                    tiles.move_to_end(key)
+                batch.append((tile, (cx * ts - left, cy * ts - top)))
+        screen.blits(batch, False)
+
+        # Выбрасываем давно не видимые плитки, но не те, что нужны этому кадру
+        while self.bytes > self.budget_bytes and len(tiles) > len(batch):
+            _, tile = tiles.popitem(last=False)
+            self.bytes -= self.tile_bytes(tile)
\ No newline at end of file
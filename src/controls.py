@@ -0,0 +1,57 @@
+# controls.py
+import pygame
+from collections import namedtuple
+
+# Состояние управления на один тик физики
+InputState = namedtuple("InputState", ["left", "right", "up", "down", "jump", "dash"])
+
+NO_INPUT = InputState(False, False, False, False, False, False)
+
+
+class KeyboardInput:
+    """Источник ввода по умолчанию — клавиатура."""
+
+    def read(self):
+        keys = pygame.key.get_pressed()
+        return InputState(
+            left=keys[pygame.K_LEFT],
+            right=keys[pygame.K_RIGHT],
+            up=keys[pygame.K_UP],
+            down=keys[pygame.K_DOWN],
+            jump=keys[pygame.K_SPACE],
+            dash=keys[pygame.K_LSHIFT],
+        )
+
+
+class ScriptedInput:
+    """Заранее заданная последовательность состояний, по одному на тик.
+
+    Когда сценарий закончился, кнопки считаются отпущенными
+    (или сценарий повторяется сначала, если loop=True).
+    """
+
+    def __init__(self, states, loop=False):
+        self.states = list(states)
+        self.loop = loop
+        self.index = 0
+
+    def read(self):
+        if self.index >= len(self.states):
+            if not self.loop or not self.states:
+                return NO_INPUT
+            self.index = 0
+        state = self.states[self.index]
+        self.index += 1
+        return state
+
+def to_bits(state):
+    """Упаковывает InputState в байт: по биту на кнопку в порядке полей."""
+    bits = 0
+    for i, pressed in enumerate(state):
+        if pressed:
+            bits |= 1 << i
+    return bits
+
+
+def from_bits(bits):
+    return InputState(*(bool(bits & (1 << i)) for i in range(len(InputState._fields))))
\ No newline at end of file
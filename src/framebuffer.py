@@ -0,0 +1,60 @@
+# framebuffer.py
+import pygame
+
+# Логический размер кадра игры: столько мира видит камера
+VIEW_SIZE = (800, 600)
+
+
+class Framebuffer:
+    """Внутренний кадр размером VIEW_SIZE, в который рисуется мир (уровень,
+    актёры, игрок, частицы), и его вывод в окно одним масштабированием.
+
+    Если окно совпадает с VIEW_SIZE, кадр — это само окно и present() ничего
+    не делает. Иначе кадр растягивается с сохранением пропорций по центру
+    окна; integer=True — только в целое число раз (пиксели спрайтов остаются
+    квадратными), остаток окна — чёрные поля. HUD и меню рисуются поверх
+    уже в разрешении окна.
+    """
+
+    def __init__(self, display, view_size=VIEW_SIZE, integer=False):
+        self.display = display
+        self.view_size = view_size
+        self.integer = integer
+        width, height = display.get_size()
+        view_w, view_h = view_size
+
+        if (width, height) == view_size:
+            self.surface = display
+            self.dest = None
+            self.bars = []
+            return
+
+        self.surface = pygame.Surface(view_size, 0, display)
+        scale = min(width / view_w, height / view_h)
+        if integer:
+            scale = max(1, int(scale))
+        size = (int(view_w * scale), int(view_h * scale))
+        rect = pygame.Rect((0, 0), size)
+        rect.center = (width // 2, height // 2)
+        rect = rect.clip(display.get_rect())
+        # Подповерхность окна: transform.scale пишет в неё напрямую, без промежуточной копии
+        self.dest = display.subsurface(rect)
+        # Поля вокруг кадра
+        self.bars = [bar for bar in (
+            pygame.Rect(0, 0, width, rect.top),
+            pygame.Rect(0, rect.bottom, width, height - rect.bottom),
+            pygame.Rect(0, rect.top, rect.left, rect.height),
+            pygame.Rect(rect.right, rect.top, width - rect.right, rect.height),
+        ) if bar.width > 0 and bar.height > 0]
+
+    @property
+    def scaled(self):
+        return self.dest is not None
+
+    def present(self):
+        """Выводит внутренний кадр в окно (сам flip — за вызывающим)."""
+        if self.dest is None:
+            return
+        for bar in self.bars:
+            self.display.fill((0, 0, 0), bar)
+        pygame.transform.scale(self.surface, self.dest.get_size(), self.dest)
\ No newline at end of file
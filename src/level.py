@@ -2,7 +2,17 @@
 import pygame
 import os
 import random
-import math
+from background import Background
+from neon import NeonLights, NEON_COLORS
+from spatial import SpatialHash
+from levelfile import LevelFile
+from chunkrender import ChunkRenderer
+from actors import ActorPool, ENEMY, PICKUP
+from navgraph import NavGraph
+from animation import CLOCK
+
+# Граница смерти: если игрок падает ниже этой Y-координаты — умирает
+LEVEL_DEATH_Y = 800
 
 def create_level():
     platforms = []
@@ -31,93 +41,186 @@ def create_level():
     
     return platforms
 
+def create_actors(actors):
+    """Враги и предметы для встроенного уровня (координаты — левый верхний угол).
+
+    С игроком актёры пока не взаимодействуют, поэтому Level их не создаёт:
+    набор нужен для нагрузки в headless.py --actors.
+    """
+    actors.spawn(ENEMY, 300, 512, direction=1)    # на земле между башней и центром
+    actors.spawn(ENEMY, 560, 372, direction=-1)   # на платформе 500..700
+    actors.spawn(ENEMY, 900, 312, direction=1)    # на платформе 850..1070
+    actors.spawn(PICKUP, 420, 280)
+    actors.spawn(PICKUP, 750, 220)
+    actors.spawn(PICKUP, 1040, 240)
+    actors.spawn(PICKUP, 1350, 320)
+
 class Level:
     def __init__(self):
         self.platforms = create_level()
-        self.time = 0.0
-        
+        self.init_systems(SpatialHash(self.platforms))
+
         # Неоновые огни (x, y, цвет, яркость, частота мерцания)
         self.neon_lights = []
         for _ in range(30):
             x = random.randint(0, 1600)
             y = random.randint(100, 500)
-            color = random.choice([
-                (255, 50, 100),   # розовый
-                (50, 200, 255),   # голубой
-                (255, 200, 50),   # жёлтый
-                (100, 50, 255)    # фиолетовый
-            ])
+            color = random.choice(NEON_COLORS)
             freq = random.uniform(0.5, 2.0)
             self.neon_lights.append((x, y, color, freq))
+        self.neon = NeonLights(self.neon_lights)
+
+    def init_systems(self, platform_index):
+        """Подсистемы, общие для встроенного и потокового уровня: новые
+        добавляются здесь, а не в __init__ каждого класса."""
+        self.platform_index = platform_index
+        # Граф путей для ИИ; рёбра считаются по запросу
+        self.nav = NavGraph(platform_index)
+        # Декор: прямоугольники без столкновений между зданиями и платформами
+        self.decor_index = SpatialHash()
+        self.static_layer = ChunkRenderer()
+        self.actors = ActorPool(death_y=LEVEL_DEATH_Y)
+        self.time = 0.0
+        self.prev_time = 0.0
+        self.background = Background()
+
+    def spawn_point(self):
+        """Точка появления игрока: над серединой уровня, на самой нижней платформе (земле)."""
+        ground_y = max(plat.y for plat in self.platforms if plat.width > 100 and plat.height > 50)
+
+        min_x = min(plat.x for plat in self.platforms)
+        max_x = max(plat.x + plat.width for plat in self.platforms)
+        spawn_x = (min_x + max_x) // 2
+        spawn_y = ground_y - 28  # 28 — высота hitbox
+        return spawn_x, spawn_y
+
+    def stream_around(self, x):
+        """Подгрузка окрестности точки x; встроенный уровень целиком в памяти."""
+
+    def loaded_span(self):
+        """Полоса x, где есть платформы для столкновений; None — весь уровень."""
+        return None
 
     def update(self, dt_ms):
+        self.prev_time = self.time
         self.time += dt_ms / 1000.0
+        CLOCK.tick(dt_ms)
+        self.actors.update(self.platform_index, self.loaded_span())
+
+    def draw(self, screen, camera, alpha=1.0):
+        time = self.prev_time + (self.time - self.prev_time) * alpha
 
-    def draw(self, screen, camera, dt_ms):
-        self.update(dt_ms)
-        width, height = screen.get_size()
-
-        # === Фон: тёмное небо ===
-        bg_surface = pygame.Surface((width, height))
-        
-        # Градиент: от чёрного (внизу) к тёмно-синему (вверху)
-        for y in range(height):
-            t = y / height
-            r = int(5 * (1 - t))
-            g = int(5 * (1 - t))
-            b = int(20 + 10 * (1 - t))
-            pygame.draw.line(bg_surface, (r, g, b), (0, y), (width, y))
-        
-        # Параллакс фона
-        bg_x = -camera.x * 0.1
-        screen.blit(bg_surface, (bg_x % width - width, 0))
-        screen.blit(bg_surface, (bg_x % width, 0))
+        # === Фон: тёмное небо (запечён заранее) ===
+        self.background.draw_sky(screen)
 
         # === Мерцающие неоновые огни ===
-        for x, y, base_color, freq in self.neon_lights:
-            # Пульсация яркости
-            pulse = math.sin(self.time * freq) * 0.5 + 0.5  # от 0 до 1
-            brightness = 0.6 + 0.4 * pulse
-            color = (
-                min(255, int(base_color[0] * brightness)),
-                min(255, int(base_color[1] * brightness)),
-                min(255, int(base_color[2] * brightness))
-            )
-            screen_x = x - camera.x
-            screen_y = y - camera.y
-            if -10 < screen_x < width + 10 and -10 < screen_y < height + 10:
-                pygame.draw.circle(screen, color, (int(screen_x), int(screen_y)), 3)
-                # Свечение (soft glow)
-                glow = pygame.Surface((12, 12), pygame.SRCALPHA)
-                pygame.draw.circle(glow, (*color, 80), (6, 6), 6)
-                screen.blit(glow, (int(screen_x) - 6, int(screen_y) - 6))
-
-        # === Городские здания (силуэты) ===
-        # Рисуем тёмные прямоугольники как здания на заднем плане
-        building_colors = [(20, 20, 35), (25, 25, 40)]
-        buildings = [
-            (-100, 400, 100, 200),
-            (1700, 380, 120, 220),
-            (300, 480, 80, 120),
-            (600, 450, 90, 150),
-            (1000, 470, 100, 130),
-        ]
-        for bx, by, bw, bh in buildings:
-            screen_x = bx - camera.x * 0.3  # параллакс
-            if -bw < screen_x < width:
-                color = random.choice(building_colors)
-                pygame.draw.rect(screen, color, (screen_x, by, bw, bh))
-
-        # === Платформы (крыши, балконы) ===
-        for plat in self.platforms:
-            rect_on_screen = (
-                plat.x - camera.x,
-                plat.y - camera.y,
-                plat.width,
-                plat.height
-            )
-            # Тёмно-серый с неоновой кромкой
-            pygame.draw.rect(screen, (35, 35, 50), rect_on_screen)
-            # Неоновая подсветка (случайный цвет)
-            edge_color = random.choice([(80, 40, 120), (40, 100, 150), (120, 60, 80)])
-            pygame.draw.rect(screen, edge_color, rect_on_screen, 2)
\ No newline at end of file
+        self.neon.draw(screen, camera, time)
+
+        # === Городские здания (силуэты, слои параллакса) ===
+        self.background.draw_layers(screen, camera)
+
+        # === Платформы и декор: запечённые плитки под камерой ===
+        self.static_layer.draw(screen, camera, self)
+
+
+class ChunkLights:
+    """Огни всех загруженных чанков: по набору NeonLights на чанк."""
+
+    def __init__(self):
+        self.chunks = {}
+
+    def __len__(self):
+        return sum(len(lights) for lights in self.chunks.values())
+
+    def draw(self, screen, camera, time):
+        for lights in self.chunks.values():
+            lights.draw(screen, camera, time)
+
+
+class StreamingLevel(Level):
+    """Уровень из файла (levelfile.py), который держит в памяти только чанки
+    вокруг камеры: load_radius чанков в каждую сторону. Чанки дальше
+    load_radius + 1 выгружаются (запас, чтобы не грузить одно и то же
+    туда-обратно на границе)."""
+
+    def __init__(self, path, load_radius=1):
+        self.file = LevelFile(path)
+        self.load_radius = load_radius
+        self.init_systems(SpatialHash())
+        self.neon = ChunkLights()
+
+        # id платформы из файла -> [id в индексе, сколько загруженных чанков её содержат]
+        self.platform_refs = {}
+        # номер чанка -> (id платформ из файла, id декора в индексе)
+        self.chunks = {}
+
+        spawn_x = self.file.spawn[0] if self.file.spawn else 0
+        self.stream_around(spawn_x)
+
+    @property
+    def platforms(self):
+        return list(self.platform_index)
+
+    @property
+    def neon_lights(self):
+        return [light for chunk in self.neon.chunks.values() for light in chunk.lights]
+
+    def spawn_point(self):
+        if self.file.spawn:
+            return self.file.spawn
+        return super().spawn_point()
+
+    def loaded_span(self):
+        # Актёры в невыгруженных чанках замирают, а не проваливаются сквозь пол
+        if not self.chunks:
+            return (0, 0)
+        width = self.file.chunk_width
+        return (min(self.chunks) * width, (max(self.chunks) + 1) * width)
+
+    def stream_around(self, x):
+        center = int(x) // self.file.chunk_width
+        wanted = range(max(0, center - self.load_radius),
+                       min(self.file.chunk_count, center + self.load_radius + 1))
+        changed = False
+        for index in wanted:
+            if index not in self.chunks:
+                self.load_chunk(index)
+                changed = True
+        for index in list(self.chunks):
+            if abs(index - center) > self.load_radius + 1:
+                self.evict_chunk(index)
+                changed = True
+        if changed:
+            self.nav.sync()
+
+    def load_chunk(self, index):
+        platforms, lights, decor = self.file.load_chunk(index)
+        plat_ids = []
+        added = list(decor)
+        for plat_id, rect in platforms:
+            ref = self.platform_refs.get(plat_id)
+            if ref is None:
+                self.platform_refs[plat_id] = [self.platform_index.add(rect), 1]
+                added.append(rect)
+            else:
+                ref[1] += 1
+            plat_ids.append(plat_id)
+        decor_ids = [self.decor_index.add(rect) for rect in decor]
+        # Плитки, запечённые до загрузки чанка, могли не содержать его новую геометрию;
+        # платформы, уже загруженные с соседними чанками (например, земля), в плитках есть
+        if added:
+            self.static_layer.invalidate(added[0].unionall(added))
+        self.neon.chunks[index] = NeonLights(lights)
+        self.chunks[index] = (plat_ids, decor_ids)
+
+    def evict_chunk(self, index):
+        plat_ids, decor_ids = self.chunks.pop(index)
+        for plat_id in plat_ids:
+            ref = self.platform_refs[plat_id]
+            ref[1] -= 1
+            if ref[1] == 0:
+                self.platform_index.remove(ref[0])
+                del self.platform_refs[plat_id]
+        for decor_id in decor_ids:
+            self.decor_index.remove(decor_id)
+        del self.neon.chunks[index]
\ No newline at end of file
@@ -0,0 +1,151 @@
+# levelfile.py
+"""Формат уровня на диске: папка с level.json и файлами чанков.
+
+level.json:   {"version": 1, "chunk_width": 1024, "chunks": N, "width": ..., "spawn": [x, y]}
+chunk_<i>.json (полоса x от i*chunk_width до (i+1)*chunk_width):
+    {"platforms": [[id, x, y, w, h], ...],   # платформа лежит во всех чанках, которые задевает
+     "lights":    [[x, y, r, g, b, freq], ...],
+     "decor":     [[x, y, w, h], ...]}       # без столкновений, только фон
+
+Примеры:
+    python src/levelfile.py export levels/rooftops            # встроенный уровень
+    python src/levelfile.py generate levels/long --width 160000
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import pygame
+
+FORMAT_VERSION = 1
+CHUNK_WIDTH = 1024
+
+
+def chunk_span(x, width, chunk_width):
+    """Номера чанков, которые задевает отрезок [x, x + width)."""
+    first = max(0, x // chunk_width)
+    last = max(first, (x + width - 1) // chunk_width)
+    return range(first, last + 1)
+
+
+def save_level(path, platforms, lights, decor=(), spawn=None, chunk_width=CHUNK_WIDTH):
+    """Режет уровень на чанки и записывает его в папку path."""
+    width = max([p.right for p in platforms] + [x for x, _, _, _ in lights] + [1])
+    count = (width + chunk_width - 1) // chunk_width
+    chunks = [{"platforms": [], "lights": [], "decor": []} for _ in range(count)]
+
+    for plat_id, plat in enumerate(platforms):
+        for i in chunk_span(plat.x, plat.width, chunk_width):
+            chunks[i]["platforms"].append([plat_id, plat.x, plat.y, plat.width, plat.height])
+    for x, y, color, freq in lights:
+        chunks[min(count - 1, max(0, x // chunk_width))]["lights"].append([x, y, *color, freq])
+    for x, y, w, h in decor:
+        chunks[min(count - 1, max(0, x // chunk_width))]["decor"].append([x, y, w, h])
+
+    os.makedirs(path, exist_ok=True)
+    meta = {
+        "version": FORMAT_VERSION,
+        "chunk_width": chunk_width,
+        "chunks": count,
+        "width": width,
+        "spawn": list(spawn) if spawn else None,
+    }
+    with open(os.path.join(path, "level.json"), "w") as f:
+        json.dump(meta, f)
+    for i, chunk in enumerate(chunks):
+        with open(os.path.join(path, f"chunk_{i}.json"), "w") as f:
+            json.dump(chunk, f, separators=(",", ":"))
+
+
+class LevelFile:
+    """Открытый уровень: метаданные читаются сразу, чанки — по запросу."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "level.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: неподдерживаемая версия уровня {meta.get('version')}")
+        self.chunk_width = meta["chunk_width"]
+        self.chunk_count = meta["chunks"]
+        self.width = meta["width"]
+        self.spawn = tuple(meta["spawn"]) if meta.get("spawn") else None
+
+    def load_chunk(self, index):
+        """Содержимое чанка: платформы [(id, Rect)], огни [(x, y, цвет, частота)], декор [Rect]."""
+        with open(os.path.join(self.path, f"chunk_{index}.json")) as f:
+            data = json.load(f)
+        platforms = [(plat_id, pygame.Rect(x, y, w, h)) for plat_id, x, y, w, h in data["platforms"]]
+        lights = [(x, y, (r, g, b), freq) for x, y, r, g, b, freq in data["lights"]]
+        decor = [pygame.Rect(x, y, w, h) for x, y, w, h in data["decor"]]
+        return platforms, lights, decor
+
+    def all_platforms(self):
+        """Все платформы уровня {id: Rect} — читает каждый чанк (для офлайн-инструментов)."""
+        platforms = {}
+        for index in range(self.chunk_count):
+            for plat_id, rect in self.load_chunk(index)[0]:
+                platforms[plat_id] = rect
+        return platforms
+
+    def digest(self):
+        """Хеш содержимого всех файлов уровня — ключ для кешей, посчитанных по уровню."""
+        sha = hashlib.sha1()
+        names = ["level.json"] + [f"chunk_{i}.json" for i in range(self.chunk_count)]
+        for name in names:
+            with open(os.path.join(self.path, name), "rb") as f:
+                sha.update(f.read())
+        return sha.hexdigest()
+
+
+def generate_level(width, seed=0):
+    """Длинный уровень для проверки стриминга: земля, платформы, стены и огни."""
+    from neon import NEON_COLORS
+
+    rng = random.Random(seed)
+    platforms = [pygame.Rect(0, 540, width, 60)]
+    decor = []
+    lights = []
+    x = 200
+    while x < width - 200:
+        platforms.append(pygame.Rect(x, rng.randint(250, 420), rng.randint(80, 220), rng.randint(20, 30)))
+        if rng.random() < 0.15:
+            platforms.append(pygame.Rect(x + 60, rng.randint(150, 300), 50, 240))
+        if rng.random() < 0.5:
+            decor.append((x, rng.randint(440, 500), rng.randint(60, 120), 40))
+        x += rng.randint(150, 350)
+    for _ in range(width // 50):
+        lights.append((rng.randint(0, width), rng.randint(100, 500),
+                       rng.choice(NEON_COLORS), rng.uniform(0.5, 2.0)))
+    return platforms, lights, decor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Инструменты формата уровня")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="записать встроенный уровень")
+    export.add_argument("path")
+    export.add_argument("--seed", type=int, default=0, help="зерно для расстановки огней")
+    generate = sub.add_parser("generate", help="сгенерировать длинный уровень")
+    generate.add_argument("path")
+    generate.add_argument("--width", type=int, default=160000)
+    generate.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-width", type=int, default=CHUNK_WIDTH)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from level import Level
+
+        random.seed(args.seed)
+        level = Level()
+        save_level(args.path, level.platforms, level.neon_lights, spawn=level.spawn_point(),
+                   chunk_width=args.chunk_width)
+    else:
+        platforms, lights, decor = generate_level(args.width, args.seed)
+        save_level(args.path, platforms, lights, decor, spawn=(50, 492), chunk_width=args.chunk_width)
+    print(f"saved {args.path}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,91 +1,191 @@
 # main.py
 import pygame
 from player import Player
-from level import Level
+from level import Level, StreamingLevel, LEVEL_DEATH_Y
+from timestep import FixedTimestep
+from controls import KeyboardInput
+from replay import InputRecorder, new_seed
+from profiler import FrameProfiler
+from assets import AssetLoader
+from textcache import TEXT, TextLabel, get_font
+from quality import QUALITY, QUALITY_LEVELS
+from framebuffer import Framebuffer, VIEW_SIZE
+from snapshot import snapshot, restore
+import argparse
+import random
 import sys
+import time
 
-# Граница смерти: если игрок падает ниже этой Y-координаты — умирает
-LEVEL_DEATH_Y = 800
+# Предел частоты отрисовки; физика от него не зависит (см. timestep.py)
+MAX_RENDER_FPS = 144
+
+# Сколько меню, пауза и экран смерти ждут ввода, прежде чем проснуться
+IDLE_WAIT_MS = 500
+LOADING_POLL_MS = 50  # пока грузятся спрайты — чаще, чтобы обновлять прогресс
 
 # === UI-КЛАССЫ (встроены для простоты) ===
 
-class MainMenu:
+def wait_events(timeout_ms):
+    """Ждёт первое событие не дольше timeout_ms (процесс спит), затем забирает остальные."""
+    event = pygame.event.wait(timeout_ms)
+    if event.type == pygame.NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+class IdleScreen:
+    """Экран без анимации: кадр собирается один раз, дальше перерисовываются
+    только изменившиеся строки, а draw() возвращает их для display.update."""
+
     def __init__(self, screen, font):
         self.screen = screen
         self.font = font
-        self.options = ["Start Game", "Settings", "Quit"]
+        self.needs_full = True
+
+    def invalidate(self):
+        """Следующий draw() соберёт кадр целиком (вызывается при входе на экран)."""
+        self.needs_full = True
+
+    def restore(self, rect):
+        """Фон под областью rect."""
+        self.screen.fill((0, 0, 0), rect)
+
+    def band(self, center_y):
+        height = self.font.get_height() + 4
+        return pygame.Rect(0, center_y - height // 2, self.screen.get_width(), height)
+
+
+class MenuScreen(IdleScreen):
+    """Экран со списком пунктов, выбираемых стрелками."""
+
+    option_y = 250
+    option_step = 60
+    inactive_color = (150, 150, 150)
+
+    def __init__(self, screen, font, options):
+        super().__init__(screen, font)
+        self.options = options
         self.selected = 0
+        self.drawn_selected = None
+
+    def draw_option(self, i):
+        color = (255, 255, 255) if i == self.selected else self.inactive_color
+        text = TEXT.render(self.font, self.options[i], color)
+        rect = text.get_rect(center=(self.screen.get_width() // 2, self.option_y + i * self.option_step))
+        self.screen.blit(text, rect)
+
+    def draw_options(self):
+        dirty = []
+        if self.selected != self.drawn_selected:
+            for i in {self.drawn_selected, self.selected} - {None}:
+                band = self.band(self.option_y + i * self.option_step)
+                self.restore(band)
+                self.draw_option(i)
+                dirty.append(band)
+            self.drawn_selected = self.selected
+        return dirty
+
+    def select(self, key):
+        if key == pygame.K_UP:
+            self.selected = (self.selected - 1) % len(self.options)
+        elif key == pygame.K_DOWN:
+            self.selected = (self.selected + 1) % len(self.options)
+
+
+class MainMenu(MenuScreen):
+    def __init__(self, screen, font):
+        super().__init__(screen, font, ["Start Game", "Settings", "Quit"])
+        self.loading_progress = 1.0  # доля загруженных спрайтов (обновляет main)
+        self.loading_label = TextLabel(font, (120, 120, 120))
+        self.drawn_loading = None
+
+    def loading_text(self):
+        if self.loading_progress < 1.0:
+            return f"Loading... {int(self.loading_progress * 100)}%"
+        return None
 
     def draw(self):
-        self.screen.fill((0, 0, 0))
-        title_font = pygame.font.Font(None, 64)
-        title = title_font.render("My Platformer", True, (255, 255, 255))
-        self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 100))
-
-        for i, option in enumerate(self.options):
-            color = (255, 255, 255) if i == self.selected else (150, 150, 150)
-            text = self.font.render(option, True, color)
-            rect = text.get_rect(center=(self.screen.get_width() // 2, 250 + i * 60))
-            self.screen.blit(text, rect)
-
-    def handle_input(self):
-        for event in pygame.event.get():
+        if self.needs_full:
+            self.needs_full = False
+            self.screen.fill((0, 0, 0))
+            title = TEXT.render(get_font(None, 64), "My Platformer", (255, 255, 255))
+            self.screen.blit(title, (self.screen.get_width() // 2 - title.get_width() // 2, 100))
+            self.drawn_selected = None
+            self.draw_options()
+            self.drawn_loading = None
+            self.draw_loading()
+            return [self.screen.get_rect()]
+        return self.draw_options() + self.draw_loading()
+
+    def draw_loading(self):
+        text = self.loading_text()
+        if text == self.drawn_loading:
+            return []
+        self.drawn_loading = text
+        band = self.band(self.screen.get_height() - 40 + self.font.get_height() // 2)
+        self.restore(band)
+        if text is not None:
+            self.screen.blit(self.loading_label.render(text), (10, self.screen.get_height() - 40))
+        return [band]
+
+    def handle_input(self, timeout_ms):
+        for event in wait_events(timeout_ms):
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                return "quit"
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    self.selected = (self.selected - 1) % len(self.options)
-                elif event.key == pygame.K_DOWN:
-                    self.selected = (self.selected + 1) % len(self.options)
-                elif event.key == pygame.K_RETURN:
+                self.select(event.key)
+                if event.key == pygame.K_RETURN:
                     if self.selected == 0:
                         return "start"
                     elif self.selected == 1:
                         return "settings"  # пока заглушка
                     elif self.selected == 2:
-                        pygame.quit()
-                        sys.exit()
+                        return "quit"
         return None
 
 
-class PauseMenu:
+class PauseMenu(MenuScreen):
+    option_y = 220
+    option_step = 50
+    inactive_color = (180, 180, 180)
+
     def __init__(self, screen, font):
-        self.screen = screen
-        self.font = font
-        self.options = ["Resume", "Main Menu", "Quit"]
-        self.selected = 0
+        super().__init__(screen, font, ["Resume", "Main Menu", "Quit"])
+        self.overlay = None
+        self.snapshot = None
+
+    def restore(self, rect):
+        self.screen.blit(self.snapshot, rect, rect)
 
     def draw(self):
-        overlay = pygame.Surface(self.screen.get_size())
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
-
-        for i, option in enumerate(self.options):
-            color = (255, 255, 255) if i == self.selected else (180, 180, 180)
-            text = self.font.render(option, True, color)
-            rect = text.get_rect(center=(self.screen.get_width() // 2, 220 + i * 50))
-            self.screen.blit(text, rect)
-
-    def handle_input(self):
-        for event in pygame.event.get():
+        if self.needs_full:
+            self.needs_full = False
+            # Кадр игры под меню затемняется один раз и дальше берётся из снимка
+            if self.overlay is None or self.overlay.get_size() != self.screen.get_size():
+                self.overlay = pygame.Surface(self.screen.get_size())
+                self.overlay.set_alpha(180)
+                self.overlay.fill((0, 0, 0))
+            self.snapshot = self.screen.copy()
+            self.snapshot.blit(self.overlay, (0, 0))
+            self.screen.blit(self.snapshot, (0, 0))
+            self.drawn_selected = None
+            self.draw_options()
+            return [self.screen.get_rect()]
+        return self.draw_options()
+
+    def handle_input(self, timeout_ms):
+        for event in wait_events(timeout_ms):
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                return "quit"
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_UP:
-                    self.selected = (self.selected - 1) % len(self.options)
-                elif event.key == pygame.K_DOWN:
-                    self.selected = (self.selected + 1) % len(self.options)
-                elif event.key == pygame.K_RETURN:
+                self.select(event.key)
+                if event.key == pygame.K_RETURN:
                     if self.selected == 0:
                         return "resume"
                     elif self.selected == 1:
                         return "menu"
                     elif self.selected == 2:
-                        pygame.quit()
-                        sys.exit()
+                        return "quit"
         return None
 
 
@@ -95,42 +195,44 @@ class HUD:
         self.font = font
         self.player = player
         self.start_time = start_time
+        # Надписи перерисовываются только при смене значения
+        self.health_label = TextLabel(font, (255, 255, 255))
+        self.timer_label = TextLabel(font, (255, 255, 255))
 
     def draw(self):
         # Здоровье
-        health_text = self.font.render(f"Health: {self.player.health}", True, (255, 255, 255))
+        health_text = self.health_label.render(f"Health: {self.player.health}")
         self.screen.blit(health_text, (10, 10))
 
         # Таймер
         elapsed_sec = (pygame.time.get_ticks() - self.start_time) // 1000
-        timer_text = self.font.render(f"Time: {elapsed_sec}s", True, (255, 255, 255))
+        timer_text = self.timer_label.render(f"Time: {elapsed_sec}s")
         self.screen.blit(timer_text, (10, 40))
 
         # Подсказка
-        hint = self.font.render("Press ESC to pause", True, (200, 200, 200))
+        hint = TEXT.render(self.font, "Press ESC to pause", (200, 200, 200))
         self.screen.blit(hint, (10, self.screen.get_height() - 30))
 
 
-class DeathScreen:
-    def __init__(self, screen, font):
-        self.screen = screen
-        self.font = font
-
+class DeathScreen(IdleScreen):
     def draw(self):
+        if not self.needs_full:
+            return []
+        self.needs_full = False
         self.screen.fill((0, 0, 0))
-        text = self.font.render("You Died!", True, (255, 0, 0))
-        restart = self.font.render("Press R to Restart", True, (255, 255, 255))
-        menu = self.font.render("Press M for Main Menu", True, (255, 255, 255))
+        text = TEXT.render(self.font, "You Died!", (255, 0, 0))
+        restart = TEXT.render(self.font, "Press R to Restart", (255, 255, 255))
+        menu = TEXT.render(self.font, "Press M for Main Menu", (255, 255, 255))
 
         self.screen.blit(text, (self.screen.get_width() // 2 - text.get_width() // 2, 200))
         self.screen.blit(restart, (self.screen.get_width() // 2 - restart.get_width() // 2, 280))
         self.screen.blit(menu, (self.screen.get_width() // 2 - menu.get_width() // 2, 320))
+        return [self.screen.get_rect()]
 
-    def handle_input(self):
-        for event in pygame.event.get():
+    def handle_input(self, timeout_ms):
+        for event in wait_events(timeout_ms):
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                return "quit"
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_r:
                     return "restart"
@@ -148,99 +250,205 @@ class Camera:
         self.width = width
         self.height = height
 
-    def update(self, target):
-        self.x = target.x - self.width // 2
+    def update(self, target, alpha=1.0):
+        x, _ = target.render_pos(alpha)
+        self.x = x - self.width // 2
         self.y = 0
 
 
-def reset_game():
-    """Создаёт новый уровень и игрока, возвращает их и время начала."""
-    level = Level()
-
-    # Находим самую нижнюю платформу (землю)
-    ground_y = max(plat.y for plat in level.platforms if plat.width > 100 and plat.height > 50)
-    
-    min_x = min(plat.x for plat in level.platforms)
-    max_x = max(plat.x + plat.width for plat in level.platforms)
-    spawn_x = (min_x + max_x) // 2
-    spawn_y = ground_y - 28  # 28 — высота hitbox
+def reset_game(input_source=None, seed=None, level_path=None):
+    """Создаёт новый уровень и игрока, возвращает их и время начала.
 
-    player = Player(spawn_x, spawn_y)
+    seed задаёт глобальный random: от него зависят огни уровня и частицы.
+    level_path — папка уровня (levelfile.py); без неё встроенный уровень.
+    """
+    if seed is not None:
+        random.seed(seed)
+    level = StreamingLevel(level_path) if level_path else Level()
+    spawn_x, spawn_y = level.spawn_point()
+    player = Player(spawn_x, spawn_y, input_source)
     start_time = pygame.time.get_ticks()
     return level, player, start_time
 
 
+def start_session(record_path, level_path=None):
+    """Новый забег; при включённой записи ввод идёт через InputRecorder."""
+    if not record_path:
+        return reset_game(level_path=level_path), None
+    seed = new_seed()
+    recorder = InputRecorder(KeyboardInput(), seed, level_path)
+    return reset_game(recorder, seed, level_path), recorder
+
+
+def save_recording(recorder, record_path):
+    if recorder is not None:
+        recorder.recording.save(record_path)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Platformer Game")
+    parser.add_argument("--record", metavar="PATH", help="записывать ввод забега в файл (см. replay.py)")
+    parser.add_argument("--level", metavar="DIR", help="уровень с диска (см. levelfile.py)")
+    parser.add_argument("--quality", type=int, choices=range(len(QUALITY_LEVELS)),
+                        help="постоянный уровень качества (0 — лучшее); без него подбирается по FPS")
+    parser.add_argument("--scale", type=float, default=1.0, help="размер окна в разах от 800x600")
+    parser.add_argument("--fullscreen", action="store_true", help="во весь экран")
+    parser.add_argument("--integer-scale", action="store_true",
+                        help="растягивать кадр только в целое число раз (чёткие пиксели)")
+    args = parser.parse_args()
+    if args.quality is not None:
+        QUALITY.fix(args.quality)
+    recorder = None
+
     pygame.init()
-    screen = pygame.display.set_mode((800, 600))
+    if args.fullscreen:
+        screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    else:
+        screen = pygame.display.set_mode((int(VIEW_SIZE[0] * args.scale), int(VIEW_SIZE[1] * args.scale)))
+    # Мир рисуется в кадр VIEW_SIZE и растягивается на окно одним вызовом
+    framebuffer = Framebuffer(screen, VIEW_SIZE, integer=args.integer_scale)
     pygame.display.set_caption("Platformer Game")
     clock = pygame.time.Clock()
-    font = pygame.font.Font(None, 36)
+    font = get_font(None, 36)
 
     game_state = "menu"
 
-    level, player, start_time = reset_game()
-    camera = Camera(800, 600)
+    # Спрайты декодируются в фоне, пока на экране меню; уровень и игрок
+    # создаются только при старте игры
+    loader = AssetLoader()
+    loader.start()
+    level = player = hud = None
+    camera = Camera(*VIEW_SIZE)
+    timestep = FixedTimestep()
+    profiler = FrameProfiler()
 
     main_menu = MainMenu(screen, font)
     pause_menu = PauseMenu(screen, font)
-    hud = HUD(screen, font, player, start_time)
     death_screen = DeathScreen(screen, font)
+    screens = {"menu": main_menu, "paused": pause_menu, "dead": death_screen}
+    shown_state = None
 
     running = True
     while running:
-        dt_ms = clock.tick(60)
-
+        dt_ms = clock.tick(MAX_RENDER_FPS)
+        frame_start = time.perf_counter()
+
+        # При входе в состояние: экраны собирают кадр заново, физика не догоняет время простоя
+        frame_state = game_state
+        if frame_state != shown_state:
+            if frame_state in screens:
+                screens[frame_state].invalidate()
+            else:
+                timestep.reset()
+                QUALITY.reset()
+                # dt этого кадра — время ожидания в меню или на паузе, его не догоняем
+                dt_ms = 0
+            shown_state = frame_state
+
+        # Меню, пауза и смерть рисуют только изменения и спят в ожидании ввода
         if game_state == "menu":
-            action = main_menu.handle_input()
-            main_menu.draw()
+            main_menu.loading_progress = loader.progress
+            pygame.display.update(main_menu.draw())
+            action = main_menu.handle_input(LOADING_POLL_MS if not loader.finished else IDLE_WAIT_MS)
+            if loader.ready:
+                loader.finish()  # упаковка атласа и convert_alpha — в главном потоке
             if action == "start":
-                level, player, start_time = reset_game()
-                camera = Camera(800, 600)
+                loader.finish()  # если загрузка ещё не закончилась — дожидаемся
+                (level, player, start_time), recorder = start_session(args.record, args.level)
+                # Состояние на старте забега: рестарт после смерти возвращается к нему без перестройки уровня
+                checkpoint = snapshot(level, player)
+                camera = Camera(*VIEW_SIZE)
                 hud = HUD(screen, font, player, start_time)
                 game_state = "playing"
             elif action == "settings":
                 pass
+            elif action == "quit":
+                running = False
 
         elif game_state == "playing":
+            profiler.begin_frame()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
                 elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     game_state = "paused"
-
-            player.update(level.platforms, dt_ms)
-            camera.update(player)
-
-            if player.health <= 0 or player.rect.top > LEVEL_DEATH_Y:
-                game_state = "dead"
-
-            screen.fill((0, 0, 0))
-            level.draw(screen, camera, dt_ms)  # ← передаём dt_ms для анимации фона!
-            player.draw(screen, camera)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    profiler.begin_frame()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.dump_csv(f"profile_{pygame.time.get_ticks()}.csv")
+            profiler.mark("events")
+
+            # Физика идёт фиксированными тиками, сколько бы ни длился кадр
+            for _ in range(timestep.advance(dt_ms)):
+                player.update(level.platform_index, timestep.dt_ms)
+                level.update(timestep.dt_ms)
+                if player.health <= 0 or player.rect.top > LEVEL_DEATH_Y:
+                    game_state = "dead"
+                    save_recording(recorder, args.record)
+                    break
+            profiler.mark("update")
+
+            # Отрисовка интерполирует между двумя последними тиками
+            alpha = timestep.alpha
+            camera.update(player, alpha)
+            level.stream_around(camera.x + camera.width / 2)
+            profiler.mark("camera")
+
+            frame = framebuffer.surface
+            frame.fill((0, 0, 0))
+            level.draw(frame, camera, alpha)
+            profiler.mark("level")
+            level.actors.draw(frame, camera, alpha)
+            profiler.mark("actors")
+            player.draw(frame, camera, alpha, draw_particles=False)
+            profiler.mark("player")
+            player.particles.draw(frame, camera)
+            profiler.mark("particles")
+            framebuffer.present()
+            profiler.mark("present")
             hud.draw()
+            profiler.mark("hud")
+            profiler.draw(screen)
 
         elif game_state == "paused":
-            action = pause_menu.handle_input()
-            pause_menu.draw()
+            pygame.display.update(pause_menu.draw())
+            action = pause_menu.handle_input(IDLE_WAIT_MS)
             if action == "resume":
                 game_state = "playing"
             elif action == "menu":
+                save_recording(recorder, args.record)
                 game_state = "menu"
+            elif action == "quit":
+                running = False
 
         elif game_state == "dead":
-            action = death_screen.handle_input()
-            death_screen.draw()
+            pygame.display.update(death_screen.draw())
+            action = death_screen.handle_input(IDLE_WAIT_MS)
             if action == "restart":
-                level, player, start_time = reset_game()
-                camera = Camera(800, 600)
-                hud = HUD(screen, font, player, start_time)
+                if recorder is None:
+                    restore(checkpoint, level, player)
+                    hud.start_time = pygame.time.get_ticks()
+                else:
+                    # Запись начинается с нового зерна, поэтому забег создаётся заново
+                    (level, player, start_time), recorder = start_session(args.record, args.level)
+                    checkpoint = snapshot(level, player)
+                    hud = HUD(screen, font, player, start_time)
+                camera = Camera(*VIEW_SIZE)
                 game_state = "playing"
             elif action == "menu":
                 game_state = "menu"
+            elif action == "quit":
+                running = False
 
-        pygame.display.flip()
+        if frame_state == "playing":
+            pygame.display.flip()
+            profiler.mark("flip")
+            profiler.end_frame()
+            # Время работы кадра без ожидания ограничителя FPS — по нему подстраивается качество
+            QUALITY.record((time.perf_counter() - frame_start) * 1000.0)
 
+    save_recording(recorder, args.record)
     pygame.quit()
     sys.exit()
 
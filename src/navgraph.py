@@ -0,0 +1,367 @@
+# navgraph.py
+import heapq
+import math
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+import pygame
+from player import (ACCELERATION, MAX_SPEED, GRAVITY, JUMP_POWER, MAX_FALL_SPEED, DOUBLE_JUMP_FACTOR,
+                    WALL_JUMP_FACTOR, CLIMB_SPEED, DASH_SPEED, PLAYER_WIDTH, PLAYER_HEIGHT)
+
+# Сколько тиков полёта просчитываем для дуг прыжка и падения
+ARC_TICKS = 240
+
+# Ребро графа: куда, каким ходом, цена в тиках, откуда отталкиваться (x на исходной платформе),
+# в какую сторону держать (-1, 0, 1) и с какого тика полёта (раньше — только вверх)
+NavEdge = namedtuple("NavEdge", "target kind cost take_off direction steer_at")
+
+
+def flight_arc(first_vel, second_vel=None):
+    """Высота (вниз — плюс) по тикам полёта так же, как считает Player.update:
+    скорость += гравитация, не быстрее MAX_FALL_SPEED, потом сдвиг.
+    second_vel — второй прыжок в верхней точке."""
+    heights = []
+    y = 0.0
+    vel = first_vel
+    second = second_vel
+    for _ in range(ARC_TICKS):
+        vel = min(vel + GRAVITY, MAX_FALL_SPEED)
+        y += vel
+        heights.append(y)
+        if second is not None and vel >= 0:
+            vel = second
+            second = None
+    return heights
+
+
+class Arc:
+    """Дуга полёта: высота подъёма и время приземления на заданной высоте."""
+
+    def __init__(self, heights):
+        self.heights = heights
+        self.apex = min(range(len(heights)), key=heights.__getitem__)
+        self.rise = -min(0.0, heights[self.apex])
+        # После верхней точки высота только растёт — ищем приземление бинарным поиском
+        self.falling = heights[self.apex:]
+
+    def landing_ticks(self, dy):
+        """Тиков до того, как ноги на спуске опустятся до dy (вниз — плюс); None, если не долетаем."""
+        if dy < -self.rise:
+            return None
+        i = bisect_left(self.falling, dy)
+        if i == len(self.falling):
+            return None
+        return self.apex + i + 1
+
+
+JUMP_ARC = Arc(flight_arc(JUMP_POWER))
+DOUBLE_ARC = Arc(flight_arc(JUMP_POWER, JUMP_POWER * DOUBLE_JUMP_FACTOR))
+WALL_ARC = Arc(flight_arc(JUMP_POWER * WALL_JUMP_FACTOR, JUMP_POWER * DOUBLE_JUMP_FACTOR))
+FALL_ARC = Arc(flight_arc(0.0))
+
+# Дальше по горизонтали и вниз рёбра не ищем
+REACH_X = int(DASH_SPEED * DOUBLE_ARC.landing_ticks(0))
+REACH_DOWN = 600
+
+
+def gap_between(a_left, a_right, b_left, b_right):
+    """Расстояние между отрезками по x (0, если пересекаются)."""
+    return max(0, b_left - a_right, a_left - b_right)
+
+
+class NavGraph:
+    """Навигационный граф по платформам уровня для ИИ.
+
+    Вершины — платформы пространственного индекса (их id), рёбра — ходы
+    игрока: walk, fall, jump, double_jump, climb (на стену и по ней наверх) и
+    wall_jump. Цена ребра — время в тиках по константам Player; ход
+    попадает в граф, только если хитбокс игрока проходит его дугу, не
+    задев другие платформы (flight_clear). Рёбра считаются лениво при
+    первом обращении к вершине.
+
+    find_path (A*) кеширует маршруты. Когда платформы меняются (sync после
+    подгрузки чанков или invalidate(rect)), пересчитываются только рёбра
+    вершин рядом с изменением, а из кеша выбрасываются маршруты через них
+    и все «маршрута нет».
+    """
+
+    def __init__(self, platforms, cache_size=256):
+        self.platforms = platforms
+        self.cache_size = cache_size
+        self.edges = {}
+        self.rects = {}
+        self.stale = set()
+        self.paths = OrderedDict()
+        self.sync()
+
+    def sync(self):
+        """Сверяет граф с индексом платформ: добавленные и удалённые платформы
+        помечают соседей для пересчёта. Возвращает True, если что-то изменилось."""
+        current = self.platforms.rects
+        added = [plat_id for plat_id in current if plat_id not in self.rects]
+        removed = [plat_id for plat_id in self.rects if plat_id not in current]
+        if not added and not removed:
+            return False
+        changed = [current[plat_id] for plat_id in added] + [self.rects[plat_id] for plat_id in removed]
+        for plat_id in removed:
+            del self.rects[plat_id]
+            self.edges.pop(plat_id, None)
+            self.stale.discard(plat_id)
+        for plat_id in added:
+            self.rects[plat_id] = current[plat_id]
+        self.invalidate(changed[0].unionall(changed), removed)
+        return True
+
+    def invalidate(self, rect, removed=()):
+        """Геометрия в rect изменилась: рёбра вершин, которые могли вести туда, будут пересчитаны."""
+        if not self.edges and not self.paths:
+            return  # ещё ничего не посчитано
+        area = rect.inflate(REACH_X * 2, 0)
+        area.height += REACH_DOWN + int(DOUBLE_ARC.rise)
+        area.y -= REACH_DOWN
+        affected = set(removed)
+        for plat_id in self.platforms.query_ids(area):
+            affected.add(plat_id)
+            if plat_id in self.edges:
+                self.stale.add(plat_id)
+        for key in list(self.paths):
+            path = self.paths[key]
+            if path is None or key[0] in affected or any(edge.target in affected for edge in path):
+                del self.paths[key]
+
+    def neighbors(self, plat_id):
+        if plat_id in self.stale or plat_id not in self.edges:
+            self.edges[plat_id] = self.build_edges(plat_id)
+            self.stale.discard(plat_id)
+        return self.edges[plat_id]
+
+    def build_edges(self, plat_id):
+        """Самый дешёвый ход с платформы plat_id на каждую соседнюю."""
+        rects = self.platforms.rects
+        src = rects[plat_id]
+        area = pygame.Rect(src.left - REACH_X, src.top - REACH_DOWN - int(DOUBLE_ARC.rise),
+                           src.width + 2 * REACH_X, 2 * REACH_DOWN + int(DOUBLE_ARC.rise))
+        best = {}
+        for target_id in self.platforms.query_ids(area):
+            if target_id == plat_id:
+                continue
+            for edge in self.moves(src, target_id, rects[target_id]):
+                if edge.target not in best or edge.cost < best[edge.target].cost:
+                    best[edge.target] = edge
+        return list(best.values())
+
+    def moves(self, src, target_id, dst):
+        """Возможные ходы с платформы src на платформу dst."""
+        dy = dst.top - src.top  # вниз — плюс
+        gap = gap_between(src.left, src.right, dst.left, dst.right)
+        direction = 0 if gap == 0 else (1 if dst.left >= src.right else -1)
+        # Точка отрыва: ближайший к цели край исходной платформы
+        if direction > 0:
+            take_off = src.right - PLAYER_WIDTH
+        elif direction < 0:
+            take_off = src.left
+        elif dy < 0:
+            # Прямо под целью упрёмся головой — разбегаемся сбоку от неё
+            sides = [(x, side) for x, side in ((dst.left - PLAYER_WIDTH - 8, 1), (dst.right + 8, -1))
+                     if src.left <= x <= src.right - PLAYER_WIDTH]
+            if not sides:
+                return
+            take_off, direction = min(sides, key=lambda s: abs(s[0] + PLAYER_WIDTH // 2 - src.centerx))
+        else:
+            take_off = max(src.left, min(dst.centerx, src.right - PLAYER_WIDTH))
+        walk = abs(take_off + PLAYER_WIDTH // 2 - src.centerx) / MAX_SPEED
+
+        if dy == 0 and gap == 0:
+            yield NavEdge(target_id, "walk", abs(dst.centerx - src.centerx) / MAX_SPEED, take_off, direction, 0)
+            return
+
+        # Сход с края: вниз, дрейфуя в сторону
+        ticks = FALL_ARC.landing_ticks(dy) if dy > 0 else None
+        if ticks is not None:
+            for side, edge_x in ((-1, src.left - PLAYER_WIDTH), (1, src.right)):
+                drift = MAX_SPEED * ticks
+                lo, hi = (edge_x - drift, edge_x) if side < 0 else (edge_x, edge_x + drift)
+                if lo <= dst.right - PLAYER_WIDTH and hi >= dst.left:
+                    steer_at = self.steer_delay(edge_x, src.top, FALL_ARC, ticks, target_id)
+                    if steer_at is None:
+                        continue
+                    start = src.left if side < 0 else src.right - PLAYER_WIDTH
+                    cost = abs(start + PLAYER_WIDTH // 2 - src.centerx) / MAX_SPEED + ticks
+                    yield NavEdge(target_id, "fall", cost, start, side, steer_at)
+
+        # Прыжки на платформу
+        for kind, arc in (("jump", JUMP_ARC), ("double_jump", DOUBLE_ARC)):
+            ticks = arc.landing_ticks(dy)
+            if ticks is None or gap > MAX_SPEED * ticks:
+                continue
+            steer_at = self.steer_delay(take_off, src.top, arc, ticks, target_id)
+            if steer_at is not None:
+                yield NavEdge(target_id, kind, walk + ticks, take_off, direction, steer_at)
+                break
+
+        # Стена: боковая грань dst, до которой долетаем в прыжке, — по ней наверх
+        if gap > 0 and dst.bottom > src.top - DOUBLE_ARC.rise and dy < 0:
+            ticks = DOUBLE_ARC.apex
+            face = dst.left - PLAYER_WIDTH if direction > 0 else dst.right
+            steer_at = None
+            if gap <= MAX_SPEED * ticks:
+                steer_at = self.steer_delay(take_off, src.top, DOUBLE_ARC, ticks, target_id,
+                                            aim=(face, face), land=False)
+            if steer_at is not None:
+                contact = max(dst.top, src.top - DOUBLE_ARC.rise)
+                climb = (contact - dst.top) / CLIMB_SPEED
+                yield NavEdge(target_id, "climb", walk + ticks + climb, take_off, direction, steer_at)
+
+        # Отскок от стены: с грани высокой соседней платформы выше двойного прыжка
+        if dy < -DOUBLE_ARC.rise:
+            for wall_id in self.platforms.query_ids(src.inflate(REACH_X, REACH_X)):
+                wall = self.platforms.rects[wall_id]
+                if wall is src or wall is dst or wall.top > dst.top:
+                    continue
+                wall_gap = gap_between(src.left, src.right, wall.left, wall.right)
+                if wall_gap == 0 or wall.bottom <= src.top - DOUBLE_ARC.rise:
+                    continue
+                if wall_gap > MAX_SPEED * DOUBLE_ARC.apex:
+                    continue
+                # Отталкиваемся от грани, обращённой к src, разбежавшись с ближнего к ней края
+                face = wall.left if wall.left >= src.right else wall.right
+                side = 1 if face == wall.left else -1
+                start = src.right - PLAYER_WIDTH if side > 0 else src.left
+                beside = face - PLAYER_WIDTH if side > 0 else face
+                back = gap_between(face, face, dst.left, dst.right)
+                # Долёт до стены должен быть свободен
+                steer_at = self.steer_delay(start, src.top, DOUBLE_ARC, DOUBLE_ARC.apex, wall_id,
+                                            aim=(beside, beside), land=False)
+                if steer_at is None:
+                    continue
+                # Высота отскока: с середины подъёма WALL_ARC, а если по пути мешает
+                # сама цель или соседи — выше по стене, куда придётся долезть
+                for contact in (dst.top + WALL_ARC.rise / 2, dst.top + WALL_ARC.rise / 4, dst.top):
+                    ticks = WALL_ARC.landing_ticks(dst.top - contact)
+                    if (wall.bottom <= contact or ticks is None or back > MAX_SPEED * ticks
+                            or not self.flight_clear(beside, int(contact), WALL_ARC, ticks, target_id)):
+                        continue
+                    climb = max(0.0, src.top - DOUBLE_ARC.rise - contact) / CLIMB_SPEED
+                    cost = (abs(start + PLAYER_WIDTH // 2 - src.centerx) / MAX_SPEED
+                            + DOUBLE_ARC.apex + climb + ticks)
+                    yield NavEdge(target_id, "wall_jump", cost, start, side, steer_at)
+                    return
+
+    def steer_delay(self, x, bottom, arc, ticks, target_id, aim=None, land=True):
+        """Первый тик, с которого можно рулить к цели, чтобы полёт был свободен
+        (flight_clear): сразу, с середины подъёма или с верхней точки; None — никак."""
+        for delay in (0, arc.apex // 2, arc.apex):
+            if self.flight_clear(x, bottom, arc, ticks, target_id, aim, land, delay):
+                return delay
+        return None
+
+    def flight_clear(self, x, bottom, arc, ticks, target_id, aim=None, land=True, delay=0):
+        """Проводит хитбокс игрока по дуге arc из точки (x, низ bottom) так же,
+        как check_collisions: с тика delay сдвиг по x к полосе aim (по умолчанию —
+        над платформой target_id) с разгоном как у Player и упором в грани,
+        затем по высоте. True, если он садится на target_id; с land=False — если
+        за ticks тиков он долетает до боковой грани target_id (долёт до стены).
+        На подъёме игрок прилипает к любой грани вплотную (on_wall), поэтому
+        касание чужой грани — провал."""
+        rects = self.platforms.rects
+        dst = rects[target_id]
+        lo, hi = aim if aim is not None else (dst.left, max(dst.left, dst.right - PLAYER_WIDTH))
+        # Посадка — на тике, когда ноги опустились до верха цели, или на следующем
+        steps = ticks + 2 if land else ticks
+        heights = arc.heights[:steps]
+        top = bottom - PLAYER_HEIGHT
+        left = min(x, lo)
+        area = pygame.Rect(left, top + int(min(heights)), max(x, hi) - left + PLAYER_WIDTH,
+                           int(max(heights) - min(heights)) + PLAYER_HEIGHT + 1)
+        obstacles = [(plat_id, rects[plat_id]) for plat_id in self.platforms.query_ids(area)]
+
+        body = pygame.Rect(x, top, PLAYER_WIDTH, PLAYER_HEIGHT)
+        if body.collidelist([rect for _, rect in obstacles]) >= 0:
+            return False  # точка отрыва внутри другой платформы
+        prev = 0.0
+        speed = 0.0
+        for tick, height in enumerate(heights):
+            falling = height >= prev
+            prev = height
+            # Разгон с места: скорость приближается к MAX_SPEED с долей ACCELERATION
+            if tick >= delay:
+                speed += (MAX_SPEED - speed) * ACCELERATION
+            step = max(lo, min(hi, body.x)) - body.x
+            step = int(max(-speed, min(speed, step)))
+            if step:
+                body.x += step
+                for plat_id, rect in obstacles:
+                    if body.colliderect(rect):
+                        # На подъёме касание допустимо только при долёте до стены
+                        if not falling and (land or plat_id != target_id):
+                            return False
+                        if step > 0:
+                            body.right = rect.left
+                        else:
+                            body.left = rect.right
+                        speed = 0.0
+            body.y = top + int(height)
+            for plat_id, rect in obstacles:
+                if body.colliderect(rect):
+                    return land and falling and plat_id == target_id
+            if not falling:
+                # Грань вплотную сбоку (столбцы как в check_wall_collision) — игрок прилипает к ней
+                for column in (body.left - 1, body.right + 1):
+                    side = pygame.Rect(column, body.top, 1, PLAYER_HEIGHT)
+                    for plat_id, rect in obstacles:
+                        if side.colliderect(rect):
+                            return not land and plat_id == target_id
+        return False
+
+    def heuristic(self, plat_id, goal):
+        """Нижняя оценка времени: расстояние на самой большой скорости."""
+        rects = self.platforms.rects
+        a, b = rects[plat_id], rects[goal]
+        return math.hypot(a.centerx - b.centerx, a.top - b.top) / max(DASH_SPEED, MAX_FALL_SPEED)
+
+    def find_path(self, start, goal):
+        """Рёбра маршрута с платформы start на goal (A*) или None, если пути нет."""
+        key = (start, goal)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            return self.paths[key]
+        path = self.search(start, goal)
+        self.paths[key] = path
+        if len(self.paths) > self.cache_size:
+            self.paths.popitem(last=False)
+        return path
+
+    def search(self, start, goal):
+        if start not in self.platforms.rects or goal not in self.platforms.rects:
+            return None
+        if start == goal:
+            return []
+        came_from = {start: None}
+        cost = {start: 0.0}
+        frontier = [(self.heuristic(start, goal), start)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            if node == goal:
+                path = []
+                while came_from[node] is not None:
+                    prev, edge = came_from[node]
+                    path.append(edge)
+                    node = prev
+                path.reverse()
+                return path
+            for edge in self.neighbors(node):
+                new_cost = cost[node] + edge.cost
+                if new_cost < cost.get(edge.target, math.inf):
+                    cost[edge.target] = new_cost
+                    came_from[edge.target] = (node, edge)
+                    heapq.heappush(frontier, (new_cost + self.heuristic(edge.target, goal), edge.target))
+        return None
+
+    def locate(self, rect):
+        """id платформы, на которой стоит rect (или ближайшей под ним), иначе None."""
+        below = pygame.Rect(rect.x, rect.bottom, rect.width, REACH_DOWN)
+        best = None
+        for plat_id in self.platforms.query_ids(below):
+            plat = self.platforms.rects[plat_id]
+            if below.colliderect(plat) and (best is None or plat.top < self.platforms.rects[best].top):
+                best = plat_id
+        return best
\ No newline at end of file
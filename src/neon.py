@@ -0,0 +1,130 @@
+# neon.py
+import pygame
+import math
+from bisect import bisect_left, bisect_right
+from quality import QUALITY
+
+NEON_COLORS = [
+    (255, 50, 100),   # розовый
+    (50, 200, 255),   # голубой
+    (255, 200, 50),   # жёлтый
+    (100, 50, 255)    # фиолетовый
+]
+
+GLOW_RADIUS = 6
+CORE_RADIUS = 3
+GLOW_ALPHA = 80
+
+# Сколько ступеней яркости запекаем для каждого цвета
+BRIGHTNESS_STEPS = 16
+# Размер таблицы пульсации на один период синуса (степень двойки — индекс через &)
+PULSE_TABLE_SIZE = 256
+
+
+def build_pulse_table():
+    """Таблица: фаза -> номер ступени яркости. Заменяет math.sin на каждый огонь каждый кадр."""
+    table = []
+    for i in range(PULSE_TABLE_SIZE):
+        pulse = math.sin(2 * math.pi * i / PULSE_TABLE_SIZE) * 0.5 + 0.5  # от 0 до 1
+        table.append(min(BRIGHTNESS_STEPS - 1, int(pulse * BRIGHTNESS_STEPS)))
+    return table
+
+
+def bake_glow_sprite(base_color, brightness, glow=True):
+    """Огонь целиком: мягкое свечение плюс непрозрачное ядро (glow=False — только ядро)."""
+    color = (
+        min(255, int(base_color[0] * brightness)),
+        min(255, int(base_color[1] * brightness)),
+        min(255, int(base_color[2] * brightness))
+    )
+    size = GLOW_RADIUS * 2
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    if glow:
+        pygame.draw.circle(sprite, (*color, GLOW_ALPHA), (GLOW_RADIUS, GLOW_RADIUS), GLOW_RADIUS)
+    pygame.draw.circle(sprite, (*color, 255), (GLOW_RADIUS, GLOW_RADIUS), CORE_RADIUS)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    return sprite
+
+
+_glow_cache = {}
+
+
+def glow_sprites(base_color, glow=True):
+    """Спрайты всех ступеней яркости для цвета; общие для всех наборов огней (и чанков уровня)."""
+    key = (base_color, glow)
+    steps = _glow_cache.get(key)
+    if steps is None:
+        steps = []
+        for step in range(BRIGHTNESS_STEPS):
+            pulse = (step + 0.5) / BRIGHTNESS_STEPS
+            steps.append(bake_glow_sprite(base_color, 0.6 + 0.4 * pulse, glow))
+        _glow_cache[key] = steps
+    return steps
+
+
+class NeonLights:
+    """Мерцающие неоновые огни уровня.
+
+    Спрайты свечения запекаются один раз на каждый цвет и ступень яркости,
+    огни хранятся отсортированными по x, чтобы отсекать невидимые бисекцией,
+    а видимые выводятся одним вызовом Surface.blits.
+    """
+
+    def __init__(self, lights):
+        # lights: [(x, y, цвет, частота мерцания)]
+        lights = sorted(lights, key=lambda light: light[0])
+        self.lights = lights
+        self.xs = [x for x, _, _, _ in lights]
+        self.ys = [y for _, y, _, _ in lights]
+        self.colors = []
+        self.phase_scale = []
+        self.palette = []
+        for _, _, color, freq in lights:
+            if color not in self.palette:
+                self.palette.append(color)
+            self.colors.append(self.palette.index(color))
+            # Фаза в единицах таблицы пульсации на секунду
+            self.phase_scale.append(freq * PULSE_TABLE_SIZE / (2 * math.pi))
+
+        self.pulse_table = build_pulse_table()
+        self.sprites = None
+        self.core_sprites = None
+
+    def __len__(self):
+        return len(self.xs)
+
+    def bake(self):
+        self.sprites = [glow_sprites(color) for color in self.palette]
+        self.core_sprites = [glow_sprites(color, glow=False) for color in self.palette]
+
+    def draw(self, screen, camera, time):
+        if self.sprites is None:
+            self.bake()
+        width, height = screen.get_size()
+        quality = QUALITY.settings
+
+        # Отсечение по x: только огни в пределах экрана (с запасом на свечение)
+        first = bisect_left(self.xs, camera.x - 10)
+        last = bisect_right(self.xs, camera.x + width + 10)
+
+        xs, ys = self.xs, self.ys
+        colors, phase_scale = self.colors, self.phase_scale
+        table = self.pulse_table
+        sprites = self.sprites if quality.neon_glow else self.core_sprites
+        mask = PULSE_TABLE_SIZE - 1
+        min_y = camera.y - 10
+        max_y = camera.y + height + 10
+
+        # На низком качестве — каждый stride-й огонь (по индексу, чтобы набор не прыгал)
+        stride = quality.neon_stride
+        first += -first % stride
+
+        batch = []
+        for i in range(first, last, stride):
+            y = ys[i]
+            if min_y < y < max_y:
+                step = table[int(time * phase_scale[i]) & mask]
+                batch.append((sprites[colors[i]][step],
+                              (int(xs[i] - camera.x) - GLOW_RADIUS, int(y - camera.y) - GLOW_RADIUS)))
+        screen.blits(batch, False)
\ No newline at end of file
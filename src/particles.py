@@ -2,31 +2,158 @@
 
 import pygame
 import random
+import numpy as np
 
-class Particle:
-    def __init__(self, x, y, color, size, speed, lifetime):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.speed = speed
-        self.lifetime = lifetime  # ms
-        self.age = 0
-        self.vel_x = random.uniform(-speed, speed)
-        self.vel_y = random.uniform(-speed, speed)
+# Ёмкость пула по умолчанию: память выделяется один раз при создании
+DEFAULT_CAPACITY = 16384
+
+# Гравитация частиц на кадр при 60 FPS
+PARTICLE_GRAVITY = 0.1
+
+# Ступени прозрачности и предельный радиус для кеша спрайтов
+ALPHA_BUCKETS = 16
+MAX_RADIUS = 64
+
+
+class ParticlePool:
+    """Пул частиц фиксированной ёмкости в виде структуры массивов NumPy.
+
+    Живые частицы всегда лежат плотно в срезе [0, count): update двигает
+    их всех одной векторной операцией и уплотняет массивы на месте,
+    выбрасывая отжившие. Новые частицы дописываются в хвост; если пул
+    заполнен, лишние просто не создаются.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vel_x = np.zeros(capacity, dtype=np.float32)
+        self.vel_y = np.zeros(capacity, dtype=np.float32)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)  # ms
+        self.size = np.zeros(capacity, dtype=np.float32)
+        # Цвет хранится индексом в небольшой палитре пула
+        self.palette_index = np.zeros(capacity, dtype=np.int16)
+        self.palette = []
+        # Собственный генератор, засеянный из глобального random: при
+        # фиксированном random.seed поведение частиц воспроизводимо
+        self.rng = np.random.default_rng(random.getrandbits(32))
+
+    def __len__(self):
+        return self.count
+
+    def columns(self):
+        """Все столбцы состояния в постоянном порядке (уплотнение, снимки состояния)."""
+        return (self.x, self.y, self.vel_x, self.vel_y,
+                self.age, self.lifetime, self.size, self.palette_index)
+
+    def emit(self, x, y, color, size, speed, lifetime, count=1):
+        start = self.count
+        end = min(start + count, self.capacity)
+        n = end - start
+        if n <= 0:
+            return
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vel_x[start:end] = self.rng.uniform(-speed, speed, n)
+        self.vel_y[start:end] = self.rng.uniform(-speed, speed, n)
+        self.age[start:end] = 0
+        self.lifetime[start:end] = lifetime
+        self.size[start:end] = size
+        if color not in self.palette:
+            self.palette.append(color)
+        self.palette_index[start:end] = self.palette.index(color)
+        self.count = end
 
     def update(self, dt_ms):
-        self.x += self.vel_x * (dt_ms / 16.7)  # нормализация под 60 FPS
-        self.y += self.vel_y * (dt_ms / 16.7)
-        self.vel_y += 0.1 * (dt_ms / 16.7)  # гравитация
-        self.age += dt_ms
-        return self.age > self.lifetime
+        n = self.count
+        if n == 0:
+            return
+        k = dt_ms / 16.7  # нормализация под 60 FPS
+        self.x[:n] += self.vel_x[:n] * k
+        self.y[:n] += self.vel_y[:n] * k
+        self.vel_y[:n] += PARTICLE_GRAVITY * k  # гравитация
+        self.age[:n] += dt_ms
+
+        alive = self.age[:n] <= self.lifetime[:n]
+        live = int(np.count_nonzero(alive))
+        if live == n:
+            return
+        # Уплотняем живые частицы в начало массивов, не перевыделяя пул
+        for column in self.columns():
+            column[:live] = column[:n][alive]
+        self.count = live
+
+    def clear(self):
+        self.count = 0
 
     def draw(self, surface, camera):
-        if self.age <= self.lifetime:
-            alpha = max(0, 255 * (1 - self.age / self.lifetime))
-            radius = int(self.size * (1 - self.age / self.lifetime))
-            pos = (int(self.x - camera.x), int(self.y - camera.y))
-            temp_surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-            pygame.draw.circle(temp_surf, (*self.color, int(alpha)), (radius, radius), radius)
-            surface.blit(temp_surf, (pos[0] - radius, pos[1] - radius))
\ No newline at end of file
+        _renderer.draw(surface, camera, self)
+
+
+class ParticleRenderer:
+    """Рисует частицы готовыми спрайтами.
+
+    Круги заранее растеризуются по ключу (цвет, радиус, ступень прозрачности)
+    и кешируются, а все видимые частицы выводятся одним Surface.blits.
+    Кеш общий для всех пулов, поэтому кадр не создаёт новых поверхностей.
+    """
+
+    def __init__(self):
+        self.color_ids = {}
+        self.colors = []
+        self.sprites = {}
+
+    def color_id(self, color):
+        cid = self.color_ids.get(color)
+        if cid is None:
+            cid = len(self.colors)
+            self.color_ids[color] = cid
+            self.colors.append(color)
+        return cid
+
+    def sprite(self, key):
+        cid, rest = divmod(key, MAX_RADIUS * ALPHA_BUCKETS)
+        radius, bucket = divmod(rest, ALPHA_BUCKETS)
+        alpha = int(255 * (bucket + 1) / ALPHA_BUCKETS)
+        sprite = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*self.colors[cid], alpha), (radius, radius), radius)
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()
+        self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, surface, camera, pool):
+        n = pool.count
+        if n == 0:
+            return
+        width, height = surface.get_size()
+
+        life = 1 - pool.age[:n] / pool.lifetime[:n]
+        radii = np.minimum((pool.size[:n] * life).astype(np.int32), MAX_RADIUS - 1)
+        xs = (pool.x[:n] - camera.x).astype(np.int32) - radii
+        ys = (pool.y[:n] - camera.y).astype(np.int32) - radii
+
+        # Отсечение по камере и пропуск частиц, сжавшихся до нуля
+        visible = ((radii > 0) & (xs < width) & (ys < height)
+                   & (xs + 2 * radii > 0) & (ys + 2 * radii > 0))
+        if not visible.any():
+            return
+
+        palette = np.array([self.color_id(tuple(c)) for c in pool.palette], dtype=np.int32)
+        buckets = np.minimum((life * ALPHA_BUCKETS).astype(np.int32), ALPHA_BUCKETS - 1)
+        keys = (palette[pool.palette_index[:n]] * MAX_RADIUS + radii) * ALPHA_BUCKETS + buckets
+
+        sprites = self.sprites
+        batch = []
+        for key, x, y in zip(keys[visible].tolist(), xs[visible].tolist(), ys[visible].tolist()):
+            sprite = sprites.get(key)
+            if sprite is None:
+                sprite = self.sprite(key)
+            batch.append((sprite, (x, y)))
+        surface.blits(batch, False)
+
+
+_renderer = ParticleRenderer()
\ No newline at end of file
@@ -1,28 +1,56 @@
 # player.py
 import pygame
-import time
 import os
 import random
 from animation import Animation
-from particles import Particle
+from assets import ASSETS
+from controls import KeyboardInput
+from particles import ParticlePool
+from quality import QUALITY
+
+# Насколько расширять область запроса к пространственному индексу платформ
+COLLISION_MARGIN = 16
+
+# Хитбокс игрока (его же используют анализатор достижимости и навигационный граф)
+PLAYER_WIDTH = 32
+PLAYER_HEIGHT = 48
+
+# Константы движения за тик (их же используют актёры и навигационный граф)
+ACCELERATION = 0.6
+FRICTION = 0.85
+MAX_SPEED = 7
+GRAVITY = 0.8
+JUMP_POWER = -15
+MAX_FALL_SPEED = 12
+MAX_JUMPS = 2
+DOUBLE_JUMP_FACTOR = 0.9   # второй прыжок слабее первого
+WALL_JUMP_FACTOR = 0.8     # прыжок от стены
+WALL_JUMP_PUSH = 8         # горизонтальная скорость отскока от стены
+CLIMB_SPEED = 2            # подъём и спуск по стене
+DASH_SPEED = 12
+DASH_DURATION = 8
 
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, input_source=None, load_sprites=True):
+        """input_source — любой объект с методом read() -> InputState (по умолчанию клавиатура).
+        load_sprites=False — не читать спрайты с диска (безоконный режим, тесты)."""
         self.x = x
         self.y = y
-        self.width = 32
-        self.height = 48
+        self.width = PLAYER_WIDTH
+        self.height = PLAYER_HEIGHT
         self.vel_x = 0
         self.vel_y = 0
         
         # === Физика (без изменений) ===
-        self.acceleration = 0.6
-        self.friction = 0.85
-        self.max_speed = 7
-        self.gravity = 0.8
-        self.jump_power = -15
+        self.acceleration = ACCELERATION
+        self.friction = FRICTION
+        self.max_speed = MAX_SPEED
+        self.gravity = GRAVITY
+        self.jump_power = JUMP_POWER
         self.jump_held = False
         self.jump_start_time = 0
+        # Время симуляции в секундах: растёт только в update, а не по часам
+        self.sim_time = 0.0
         self.max_jump_hold_time = 0.3
 
         self.on_ground = False
@@ -30,45 +58,49 @@ class Player:
         self.wall_side = 0
 
         self.jump_count = 0
-        self.max_jumps = 2
+        self.max_jumps = MAX_JUMPS
 
         self.dash_cooldown = 0
         self.is_dashing = False
         self.dash_timer = 0
-        self.dash_duration = 8
-        self.dash_speed = 12
+        self.dash_duration = DASH_DURATION
+        self.dash_speed = DASH_SPEED
 
         self.rect = pygame.Rect(x, y, self.width, self.height)
 
+        self.input_source = input_source if input_source is not None else KeyboardInput()
+
+        # Положение на предыдущем тике — для интерполяции при отрисовке
+        self.prev_x = x
+        self.prev_y = y
+
         # === ГРАФИКА: Анимации ===
         self.animations = {}
-        self.load_animations()
+        self.load_animations(load_sprites)
         self.current_animation = self.animations['idle']
         self.facing_right = True
         self.image = self.current_animation.get_current_frame()
 
         # === Частицы ===
-        self.particles = []
+        self.particles = ParticlePool()
 
         # Для определения состояния
         self.state = 'idle'
 
         self.health = 100  # или любое начальное значение
 
-    def load_animations(self):
+    def load_animations(self, load_sprites=True):
         """Загружает анимации из папок. Если папок нет — создаёт цветные заглушки."""
         sprite_dir = "assets/sprites/player/"
         states = ['idle', 'run', 'jump', 'fall', 'wall_slide', 'roll', 'climb']
 
         for state in states:
             path = os.path.join(sprite_dir, state)
-            frames = []
-            if os.path.exists(path):
-                for file in sorted(os.listdir(path)):
-                    if file.endswith('.png'):
-                        img = pygame.image.load(os.path.join(path, file)).convert_alpha()
-                        frames.append(img)
-        
+            frames, mirrored = [], []
+            if load_sprites:
+                # Кадры и их зеркальные копии загружаются один раз на процесс
+                frames, mirrored = ASSETS.folder(path)
+
             # Если нет спрайтов — создаём цветной прямоугольник как заглушку
             if not frames:
                 color_map = {
@@ -81,9 +113,8 @@ class Player:
                     'climb': (100, 100, 255)
                 }
                 color = color_map.get(state, (255, 255, 255))
-                surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-                pygame.draw.rect(surf, color, (0, 0, self.width, self.height))
-                frames = [surf]
+                surf = ASSETS.placeholder(color, (self.width, self.height))
+                frames = mirrored = [surf]
 
             # === УСТАНАВЛИВАЕМ 12 КАДРОВ В СЕКУНДУ (83 мс на кадр) ===
             duration = 200  # ← ключевое изменение!
@@ -102,7 +133,7 @@ class Player:
             elif state == 'wall_slide' or state == 'climb':
                 duration = 250  # 4 FPS — лазание медленное и тяжёлое
 
-            self.animations[state] = Animation(frames, duration, loop)
+            self.animations[state] = Animation(frames, duration, loop, mirrored)
 
     def determine_state(self):
         if self.on_wall:
@@ -122,66 +153,69 @@ class Player:
             return 'idle'
 
     def add_dust_particles(self):
+        # random.random() вызывается всегда: от него зависит воспроизводимость записей
         if random.random() < 0.3:  # частота
-            for _ in range(3):
-                p = Particle(
-                    x=self.rect.centerx,
-                    y=self.rect.bottom,
-                    color=(180, 180, 180),
-                    size=2,
-                    speed=1.5,
-                    lifetime=400
-                )
-                self.particles.append(p)
-
-    def add_spark_particles(self):
-        for _ in range(6):
-            p = Particle(
+            self.particles.emit(
                 x=self.rect.centerx,
-                y=self.rect.centery,
-                color=(255, 215, 0),
-                size=1.5,
-                speed=2.5,
-                lifetime=300
+                y=self.rect.bottom,
+                color=(180, 180, 180),
+                size=2,
+                speed=1.5,
+                lifetime=400,
+                count=QUALITY.particles(3)
             )
-            self.particles.append(p)
+
+    def add_spark_particles(self):
+        self.particles.emit(
+            x=self.rect.centerx,
+            y=self.rect.centery,
+            color=(255, 215, 0),
+            size=1.5,
+            speed=2.5,
+            lifetime=300,
+            count=QUALITY.particles(6)
+        )
 
     def update(self, platforms, dt_ms):
+        """platforms — пространственный индекс платформ уровня (SpatialHash)."""
         # === Сохраняем предыдущее состояние для сравнения ===
         prev_state = self.state
         prev_on_ground = self.on_ground
         prev_on_wall = self.on_wall
         prev_is_dashing = self.is_dashing
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.sim_time += dt_ms / 1000.0
 
         # === Вся ваша логика (без изменений!) ===
-        keys = pygame.key.get_pressed()
+        keys = self.input_source.read()
 
         if not self.is_dashing:
             target_vel_x = 0
-            if keys[pygame.K_LEFT]:
+            if keys.left:
                 target_vel_x = -self.max_speed
-            if keys[pygame.K_RIGHT]:
+            if keys.right:
                 target_vel_x = self.max_speed
             self.vel_x += (target_vel_x - self.vel_x) * self.acceleration
         else:
             pass
 
-        if keys[pygame.K_SPACE]:
+        if keys.jump:
             if not self.jump_held:
                 if self.on_ground:
                     self.jump_count = 1
                     self.vel_y = self.jump_power
                     self.on_ground = False
                     self.jump_held = True
-                    self.jump_start_time = time.time()
+                    self.jump_start_time = self.sim_time
                 elif self.jump_count < self.max_jumps:
                     self.jump_count += 1
-                    self.vel_y = self.jump_power * 0.9
+                    self.vel_y = self.jump_power * DOUBLE_JUMP_FACTOR
                     self.jump_held = True
-                    self.jump_start_time = time.time()
+                    self.jump_start_time = self.sim_time
         else:
             if self.jump_held and self.vel_y < 0:
-                current_time = time.time()
+                current_time = self.sim_time
                 held_time = current_time - self.jump_start_time
                 if held_time < self.max_jump_hold_time:
                     self.vel_y *= held_time / self.max_jump_hold_time
@@ -190,7 +224,7 @@ class Player:
         if self.dash_cooldown > 0:
             self.dash_cooldown -= 1
 
-        if keys[pygame.K_LSHIFT] and self.dash_cooldown == 0 and not self.is_dashing:
+        if keys.dash and self.dash_cooldown == 0 and not self.is_dashing:
             direction = 1
             if self.vel_x < 0:
                 direction = -1
@@ -209,8 +243,8 @@ class Player:
 
         if not self.is_dashing:
             self.vel_y += self.gravity
-        if self.vel_y > 12:
-            self.vel_y = 12
+        if self.vel_y > MAX_FALL_SPEED:
+            self.vel_y = MAX_FALL_SPEED
 
         self.x += self.vel_x
         self.rect.x = int(self.x)
@@ -231,20 +265,20 @@ class Player:
                 self.wall_side = 1
 
         if self.on_wall:
-            if keys[pygame.K_UP]:
-                self.vel_y = -2
-            elif keys[pygame.K_DOWN]:
-                self.vel_y = 2
+            if keys.up:
+                self.vel_y = -CLIMB_SPEED
+            elif keys.down:
+                self.vel_y = CLIMB_SPEED
             else:
                 self.vel_y = max(self.vel_y, 0)
 
-        if keys[pygame.K_SPACE] and self.on_wall and not self.jump_held:
-            self.vel_y = self.jump_power * 0.8
-            self.vel_x = -self.wall_side * 8
+        if keys.jump and self.on_wall and not self.jump_held:
+            self.vel_y = self.jump_power * WALL_JUMP_FACTOR
+            self.vel_x = -self.wall_side * WALL_JUMP_PUSH
             self.on_wall = False
             self.wall_side = 0
             self.jump_held = True
-            self.jump_start_time = time.time()
+            self.jump_start_time = self.sim_time
             self.jump_count = 1
             # === Эффект: искры при wall jump ===
             self.add_spark_particles()
@@ -264,20 +298,16 @@ class Player:
             self.current_animation = self.animations[self.state]
             self.current_animation.reset()
 
-        # Обновляем анимацию
-        self.current_animation.update(dt_ms)
-        self.image = self.current_animation.get_current_frame()
-
-        # Отражаем по горизонтали, если нужно
-        if not self.facing_right:
-            self.image = pygame.transform.flip(self.image, True, False)
+        # Кадр анимации определяется общими часами (animation.CLOCK).
+        # Отражённый кадр берём готовым из кеша, если смотрим влево
+        self.image = self.current_animation.get_current_frame(not self.facing_right)
 
         # === Частицы: пыль при беге по земле ===
         if self.state == 'run' and self.on_ground and prev_on_ground:
             self.add_dust_particles()
 
         # === Обновляем частицы ===
-        self.particles = [p for p in self.particles if not p.update(dt_ms)]
+        self.particles.update(dt_ms)
 
     # --- остальные методы без изменений ---
     def check_wall_collision(self, side, platforms):
@@ -288,13 +318,15 @@ class Player:
         else:
             return False
         test_rect = pygame.Rect(test_x, self.rect.top, 1, self.rect.height)
-        for plat in platforms:
+        for plat in platforms.query(test_rect):
             if test_rect.colliderect(plat):
                 return True
         return False
 
     def check_collisions(self, platforms, direction):
-        for plat in platforms:
+        # Запас на случай, если разрешение одного столкновения сдвинет игрока к соседней платформе
+        nearby = platforms.query(self.rect.inflate(COLLISION_MARGIN * 2, COLLISION_MARGIN * 2))
+        for plat in nearby:
             if self.rect.colliderect(plat):
                 if direction == 'horizontal':
                     if self.vel_x > 0:
@@ -313,9 +345,16 @@ class Player:
                     self.vel_y = 0
                     self.y = self.rect.y
 
-    def draw(self, screen, camera):
-        # Рисуем игрока
-        screen.blit(self.image, (self.rect.x - camera.x, self.rect.y - camera.y))
-        # Рисуем частицы
-        for p in self.particles:
-            p.draw(screen, camera)
\ No newline at end of file
+    def render_pos(self, alpha):
+        """Положение между предыдущим и текущим тиком (alpha от 0 до 1)."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return x, y
+
+    def draw(self, screen, camera, alpha=1.0, draw_particles=True):
+        # Рисуем игрока (интерполированно между тиками физики)
+        x, y = self.render_pos(alpha)
+        screen.blit(self.image, (int(x) - camera.x, int(y) - camera.y))
+        # Рисуем частицы (main() рисует их отдельно, чтобы замерять этап)
+        if draw_particles:
+            self.particles.draw(screen, camera)
\ No newline at end of file
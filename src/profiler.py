@@ -0,0 +1,122 @@
+# profiler.py
+import time
+import numpy as np
+import pygame
+from textcache import get_font
+
+# Этапы кадра в порядке выполнения в main()
+STAGES = ["events", "update", "camera", "level", "actors", "player", "particles", "present", "hud", "flip"]
+STAGE_COLORS = [
+    (120, 120, 120),  # события
+    (80, 200, 120),   # физика
+    (200, 200, 80),   # камера
+    (80, 140, 255),   # уровень
+    (220, 50, 90),    # актёры
+    (255, 140, 60),   # игрок
+    (255, 215, 0),    # частицы
+    (80, 200, 200),   # масштабирование кадра
+    (200, 80, 200),   # HUD
+    (255, 80, 80),    # flip
+]
+
+FRAME_BUDGET_MS = 1000.0 / 60
+GRAPH_HEIGHT = 60
+GRAPH_MAX_MS = FRAME_BUDGET_MS * 2
+
+
+class FrameProfiler:
+    """Замер времени этапов кадра в кольцевой буфер и оверлей с графиком.
+
+    В основном цикле: begin_frame() в начале кадра, mark("этап") после каждого
+    этапа, end_frame() в конце. Пока профайлер выключен, каждый вызов — это
+    только проверка флага.
+    """
+
+    def __init__(self, capacity=600):
+        self.enabled = False
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(STAGES)), dtype=np.float32)  # мс
+        self.stage_index = {stage: i for i, stage in enumerate(STAGES)}
+        self.index = 0
+        self.count = 0
+        self.row = None
+        self.last = 0.0
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.row = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.row = self.samples[self.index]
+        self.row[:] = 0
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        if self.row is None:
+            return
+        now = time.perf_counter()
+        self.row[self.stage_index[stage]] += (now - self.last) * 1000.0
+        self.last = now
+
+    def end_frame(self):
+        if self.row is None:
+            return
+        self.row = None
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def recent(self, frames=None):
+        """Последние замеры в хронологическом порядке (строка — кадр, столбец — этап)."""
+        n = self.count if frames is None else min(frames, self.count)
+        order = (np.arange(self.index - n, self.index)) % self.capacity
+        return self.samples[order]
+
+    def dump_csv(self, path):
+        with open(path, "w") as f:
+            f.write("frame," + ",".join(STAGES) + ",total\n")
+            for i, row in enumerate(self.recent()):
+                f.write(f"{i}," + ",".join(f"{ms:.4f}" for ms in row) + f",{row.sum():.4f}\n")
+
+    def draw(self, screen):
+        if not self.enabled or self.count == 0:
+            return
+        if self.font is None:
+            self.font = get_font(None, 18)
+
+        width = min(self.capacity, 300)
+        x0 = screen.get_width() - width - 10
+        y0 = 10
+        panel = pygame.Rect(x0 - 5, y0 - 5, width + 10, GRAPH_HEIGHT + 10 + 14 * (len(STAGES) + 1))
+        pygame.draw.rect(screen, (0, 0, 0), panel)
+
+        # График: столбик на кадр, по цветам этапов
+        scale = GRAPH_HEIGHT / GRAPH_MAX_MS
+        bottom = y0 + GRAPH_HEIGHT
+        for i, row in enumerate(self.recent(width)):
+            y = bottom
+            for stage, ms in enumerate(row):
+                h = int(ms * scale)
+                if h > 0:
+                    top = max(y0, y - h)
+                    pygame.draw.line(screen, STAGE_COLORS[stage], (x0 + i, y), (x0 + i, top))
+                    y = top
+        budget_y = bottom - int(FRAME_BUDGET_MS * scale)
+        pygame.draw.line(screen, (255, 255, 255), (x0, budget_y), (x0 + width, budget_y))
+
+        # Разбивка по этапам: среднее и максимум за последнюю секунду
+        window = self.recent(60)
+        means = window.mean(axis=0)
+        peaks = window.max(axis=0)
+        y = bottom + 6
+        for stage, name in enumerate(STAGES):
+            text = self.font.render(f"{name:10s} {means[stage]:6.2f} / {peaks[stage]:6.2f} ms",
+                                    True, STAGE_COLORS[stage])
+            screen.blit(text, (x0, y))
+            y += 14
+        totals = window.sum(axis=1)
+        text = self.font.render(f"frame      {totals.mean():6.2f} / {totals.max():6.2f} ms",
+                                True, (255, 255, 255))
+        screen.blit(text, (x0, y))
\ No newline at end of file
@@ -0,0 +1,81 @@
+# quality.py
+from collections import deque, namedtuple
+from profiler import FRAME_BUDGET_MS
+
+# particle_rate   — доля частиц от обычного количества при каждом выбросе;
+# neon_stride     — рисуется каждый n-й неоновый огонь;
+# neon_glow       — мягкое свечение вокруг огней (иначе только ядро);
+# parallax_layers — сколько слоёв параллакса рисовать (None — все).
+QualitySettings = namedtuple("QualitySettings", "particle_rate neon_stride neon_glow parallax_layers")
+
+# От лучшего к худшему: сначала режем самое дорогое и наименее заметное
+QUALITY_LEVELS = [
+    QualitySettings(1.0, 1, True, None),
+    QualitySettings(0.5, 1, True, None),
+    QualitySettings(0.5, 2, True, None),
+    QualitySettings(0.25, 2, False, None),
+    QualitySettings(0.25, 4, False, 0),
+    QualitySettings(0.0, 4, False, 0),
+]
+
+
+class QualityGovernor:
+    """Подстройка качества под бюджет кадра.
+
+    main() после каждого игрового кадра передаёт в record() время работы
+    кадра (без ожидания ограничителя FPS). Если среднее за window кадров
+    выше бюджета — качество снижается на ступень; если всё это время
+    кадр укладывается в headroom бюджета — повышается, но не раньше чем
+    через raise_after кадров с последней смены, чтобы не раскачиваться.
+    Эффекты читают текущие настройки из QUALITY.settings.
+    """
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, window=30, headroom=0.6, raise_after=180):
+        self.budget_ms = budget_ms
+        self.headroom = headroom
+        self.raise_after = raise_after
+        self.samples = deque(maxlen=window)
+        self.level = 0
+        self.frames_since_change = 0
+        self.enabled = True
+
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+
+    def set_level(self, level):
+        self.level = max(0, min(len(QUALITY_LEVELS) - 1, level))
+        self.samples.clear()
+        self.frames_since_change = 0
+
+    def fix(self, level):
+        """Постоянный уровень качества; подстройка выключается."""
+        self.set_level(level)
+        self.enabled = False
+
+    def reset(self):
+        """Новая сессия: замеры сначала, уровень сохраняется (машина та же)."""
+        self.samples.clear()
+        self.frames_since_change = 0
+
+    def record(self, frame_ms):
+        if not self.enabled:
+            return
+        self.samples.append(frame_ms)
+        self.frames_since_change += 1
+        if len(self.samples) < self.samples.maxlen:
+            return
+        mean = sum(self.samples) / len(self.samples)
+        if mean > self.budget_ms and self.level < len(QUALITY_LEVELS) - 1:
+            self.set_level(self.level + 1)
+        elif (self.level > 0 and self.frames_since_change >= self.raise_after
+              and max(self.samples) < self.budget_ms * self.headroom):
+            self.set_level(self.level - 1)
+
+    def particles(self, count):
+        """Сколько частиц выпустить вместо count при текущем качестве."""
+        return int(count * self.settings.particle_rate + 0.5)
+
+
+# Единственный экземпляр на процесс
+QUALITY = QualityGovernor()
\ No newline at end of file
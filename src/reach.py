@@ -0,0 +1,267 @@
+# reach.py
+"""Офлайн-анализ достижимости: с какой платформы на какую можно попасть и каким ходом.
+
+Из точек на каждой платформе запускается настоящий Player (без спрайтов) со
+сценариями ходов — бег с обрыва, прыжок, двойной прыжок, отскок от стены,
+лазание, рывок — и записывается, на какой платформе он приземлился. Точки
+раздаются процессам multiprocessing; результат для уровня с диска кешируется
+в reach.json рядом с уровнем и пересчитывается только при изменении файлов.
+
+Примеры:
+    python src/reach.py                          # встроенный уровень
+    python src/reach.py levels/long --workers 8
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import Pool, cpu_count
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from controls import InputState, ScriptedInput, NO_INPUT
+from level import Level, LEVEL_DEATH_Y
+from levelfile import LevelFile
+from player import Player, PLAYER_WIDTH, PLAYER_HEIGHT
+from spatial import SpatialHash
+from timestep import SIM_DT_MS
+
+# Меняется при изменении ходов или логики — старые кеши становятся недействительны
+ANALYZER_VERSION = 1
+CACHE_NAME = "reach.json"
+
+SETTLE_TICKS = 3        # игрок сначала встаёт на платформу
+MOVE_TICKS = 150        # сколько тиков ждём приземления
+JUMP_HOLD_TICKS = 18    # полный прыжок (дольше max_jump_hold_time)
+# Насколько далеко по горизонтали искать платформы, под край которых стоит встать
+REACH_X = 600
+
+
+def move_list():
+    """Ходы: (название, направление -1/0/1, параметр в тиках)."""
+    moves = []
+    for direction in (-1, 1):
+        moves.append(("walk", direction, 0))
+        for hold in (6, JUMP_HOLD_TICKS):
+            moves.append(("jump", direction, hold))
+        for at in (12, 24):
+            moves.append(("double", direction, at))
+        for at in (10, 20, 30):
+            moves.append(("wall", direction, at))
+        moves.append(("climb", direction, 0))
+        moves.append(("dash", direction, 8))
+    moves.append(("jump", 0, JUMP_HOLD_TICKS))
+    moves.append(("double", 0, 18))
+    return moves
+
+
+MOVES = move_list()
+
+
+def move_script(move, ticks=MOVE_TICKS):
+    """Ввод по тикам для хода.
+
+    walk   — идти в сторону direction (сойти с края);
+    jump   — прыжок, прыжок удерживается param тиков;
+    double — прыжок и второй прыжок на тике param;
+    wall   — прыжок к стене и на тике param прыжок с разворотом (отскок от стены);
+    climb  — прыжок к стене с зажатым «вверх» (лазание);
+    dash   — прыжок и рывок на тике param.
+    """
+    name, direction, param = move
+    states = []
+    for tick in range(ticks):
+        if name == "jump":
+            jump = tick < param
+        elif name in ("double", "wall"):
+            jump = tick < min(JUMP_HOLD_TICKS, param - 2) or param <= tick < param + JUMP_HOLD_TICKS
+        else:
+            jump = name != "walk" and tick < JUMP_HOLD_TICKS
+        facing = -direction if name == "wall" and tick >= param else direction
+        states.append(InputState(
+            left=facing < 0,
+            right=facing > 0,
+            up=name == "climb",
+            down=False,
+            jump=jump,
+            dash=name == "dash" and tick == param,
+        ))
+    return states
+
+
+def standing_on(platforms, rect):
+    """id платформы прямо под ногами rect или None."""
+    feet = pygame.Rect(rect.x, rect.bottom, rect.width, 1)
+    for plat_id in platforms.query_ids(feet):
+        if feet.colliderect(platforms.rects[plat_id]):
+            return plat_id
+    return None
+
+
+def simulate(platforms, x, top, move):
+    """Игрок встаёт на платформу с верхом top в точке x и выполняет ход.
+    Возвращает (id платформы приземления, тиков) или None, если не приземлился."""
+    script = [NO_INPUT] * SETTLE_TICKS + move_script(move)
+    player = Player(x, top, ScriptedInput(script), load_sprites=False)
+    player.y = player.prev_y = top - player.height
+    player.rect.bottom = top
+
+    airborne = False
+    for tick in range(len(script)):
+        player.update(platforms, SIM_DT_MS)
+        if tick < SETTLE_TICKS:
+            continue
+        if player.rect.top > LEVEL_DEATH_Y:
+            return None
+        landed = standing_on(platforms, player.rect)
+        if landed is None:
+            airborne = True
+        elif airborne and player.vel_y >= 0:
+            return landed, tick - SETTLE_TICKS + 1
+    return None
+
+
+def start_points(platforms, plat_id):
+    """Откуда прыгать с платформы: края, середина и места под краями соседних
+    платформ (на длинной земле иначе не найти прыжки на нависающие платформы)."""
+    plat = platforms.rects[plat_id]
+    xs = {plat.left + 1, plat.centerx - PLAYER_WIDTH // 2, plat.right - PLAYER_WIDTH - 1}
+    window = pygame.Rect(plat.left - REACH_X, plat.top - 1000, plat.width + 2 * REACH_X, 1000)
+    for other_id in platforms.query_ids(window):
+        other = platforms.rects[other_id]
+        if other_id != plat_id and other.bottom <= plat.top:
+            xs.add(other.left - PLAYER_WIDTH - 8)
+            xs.add(other.right + 8)
+    points = []
+    for x in sorted(xs):
+        if plat.left <= x and x + PLAYER_WIDTH <= plat.right:
+            body = pygame.Rect(x, plat.top - PLAYER_HEIGHT, PLAYER_WIDTH, PLAYER_HEIGHT)
+            if not any(body.colliderect(r) for r in platforms.query(body)):
+                points.append(x)
+    return points
+
+
+# === Процессы-исполнители ===
+
+_worker_platforms = None
+
+
+def _init_worker(rects):
+    global _worker_platforms
+    _worker_platforms = build_index(rects)
+
+
+def _analyze_point(task):
+    """Все ходы из одной точки; рёбра (откуда, куда, x старта, тиков, ход) в id индекса."""
+    index_id, x = task
+    platforms = _worker_platforms
+    top = platforms.rects[index_id].top
+    edges = []
+    for move in MOVES:
+        result = simulate(platforms, x, top, move)
+        if result and result[0] != index_id:
+            edges.append((index_id, result[0], x, result[1], list(move)))
+    return edges
+
+
+def build_index(rects):
+    """SpatialHash платформ в порядке возрастания их id: i-й id индекса — sorted(rects)[i]."""
+    return SpatialHash(pygame.Rect(rects[plat_id]) for plat_id in sorted(rects))
+
+
+def analyze(rects, workers=None):
+    """rects: {id: (x, y, w, h)}. Возвращает лучшие рёбра {(откуда, куда): (x, тиков, ход)}."""
+    ids = sorted(rects)
+    platforms = build_index(rects)
+    tasks = [(index_id, x) for index_id in range(len(ids)) for x in start_points(platforms, index_id)]
+    best = {}
+    with Pool(workers or cpu_count(), initializer=_init_worker, initargs=(rects,)) as pool:
+        for edges in pool.imap_unordered(_analyze_point, tasks, chunksize=8):
+            for src, dst, x, ticks, move in edges:
+                src, dst = ids[src], ids[dst]
+                known = best.get((src, dst))
+                if known is None or (ticks, x) < (known[1], known[0]):
+                    best[(src, dst)] = (x, ticks, move)
+    return best
+
+
+def reachable_from(edges, start):
+    """Платформы, до которых можно добраться с платформы start (обход графа)."""
+    neighbors = {}
+    for src, dst in edges:
+        neighbors.setdefault(src, []).append(dst)
+    seen = {start}
+    queue = [start]
+    while queue:
+        for dst in neighbors.get(queue.pop(), ()):
+            if dst not in seen:
+                seen.add(dst)
+                queue.append(dst)
+    return seen
+
+
+def load_cache(path, key):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("key") != key:
+        return None
+    return {(src, dst): (x, ticks, move) for src, dst, x, ticks, move in data["edges"]}
+
+
+def save_cache(path, key, edges):
+    data = {
+        "key": key,
+        "edges": [[src, dst, x, ticks, move] for (src, dst), (x, ticks, move) in sorted(edges.items())],
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Анализ достижимости платформ")
+    parser.add_argument("level", nargs="?", help="папка уровня (levelfile.py); без неё — встроенный")
+    parser.add_argument("--workers", type=int, default=None, help="процессов (по умолчанию — все ядра)")
+    parser.add_argument("--no-cache", action="store_true", help="пересчитать, не читая reach.json")
+    args = parser.parse_args()
+
+    if args.level:
+        level_file = LevelFile(args.level)
+        rects = {plat_id: tuple(rect) for plat_id, rect in level_file.all_platforms().items()}
+        spawn = level_file.spawn
+        cache_path = os.path.join(args.level, CACHE_NAME)
+        key = f"{ANALYZER_VERSION}:{level_file.digest()}"
+    else:
+        level = Level()
+        rects = {plat_id: tuple(rect) for plat_id, rect in enumerate(level.platforms)}
+        spawn = level.spawn_point()
+        cache_path = key = None
+
+    start = time.perf_counter()
+    edges = None
+    if cache_path and not args.no_cache:
+        edges = load_cache(cache_path, key)
+    cached = edges is not None
+    if not cached:
+        edges = analyze(rects, args.workers)
+        if cache_path:
+            save_cache(cache_path, key, edges)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(rects)} platforms, {len(edges)} edges in {elapsed:.2f}s" + (" (cached)" if cached else ""))
+    if spawn:
+        # Платформа под точкой появления: ближайшая ниже неё
+        below = [plat_id for plat_id, (x, y, w, h) in rects.items() if x <= spawn[0] < x + w and y >= spawn[1]]
+        if below:
+            start_id = min(below, key=lambda plat_id: rects[plat_id][1])
+            seen = reachable_from(edges, start_id)
+            missing = sorted(set(rects) - seen)
+            print(f"reachable from spawn: {len(seen)}/{len(rects)}")
+            for plat_id in missing:
+                print(f"  unreachable {plat_id}: {rects[plat_id]}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,187 @@
+# replay.py
+"""Запись и воспроизведение ввода игрока.
+
+Запись хранит зерно генератора случайных чисел (от него зависят неоновые
+огни уровня и частицы), уровень (путь и хеш файлов; для встроенного — пусто)
+и состояние кнопок на каждый тик физики. Поскольку физика идёт
+фиксированными тиками, повтор тех же кнопок с тем же зерном на том же
+уровне воспроизводит забег точно.
+
+Пример: python src/replay.py run.rpl --speed 10
+        python src/replay.py run.rpl --no-render
+"""
+import argparse
+import os
+import struct
+import time
+import pygame
+from controls import to_bits, from_bits, NO_INPUT
+from levelfile import LevelFile
+from timestep import SIM_HZ, FixedTimestep
+
+MAGIC = b"PFRP"
+VERSION = 2
+# magic, версия, зерно, частота тиков, число тиков, SHA1 файлов уровня
+# (нули для встроенного), длина пути к уровню; за заголовком — путь в UTF-8
+HEADER = struct.Struct("<4sBIHI20sH")
+# Кнопки держат подолгу, поэтому тики пишутся сериями: (состояние кнопок, длина серии)
+RUN = struct.Struct("<BH")
+MAX_RUN = 0xFFFF
+
+
+def new_seed():
+    return int.from_bytes(os.urandom(4), "little")
+
+
+class Recording:
+    def __init__(self, seed, ticks=None, sim_hz=SIM_HZ, level_path=None, level_digest=None):
+        self.seed = seed
+        self.sim_hz = sim_hz
+        self.ticks = bytearray() if ticks is None else ticks
+        # Уровень с диска (levelfile.py); None — встроенный
+        self.level_path = level_path
+        if level_path and level_digest is None:
+            level_digest = LevelFile(level_path).digest()
+        self.level_digest = level_digest
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def save(self, path):
+        level = (self.level_path or "").encode("utf-8")
+        digest = bytes.fromhex(self.level_digest) if self.level_path else bytes(20)
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.sim_hz, len(self.ticks),
+                                    digest, len(level)))
+        out += level
+        i = 0
+        n = len(self.ticks)
+        while i < n:
+            bits = self.ticks[i]
+            run = 1
+            while i + run < n and run < MAX_RUN and self.ticks[i + run] == bits:
+                run += 1
+            out += RUN.pack(bits, run)
+            i += run
+        with open(path, "wb") as f:
+            f.write(out)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed, sim_hz, count, digest, path_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: не файл записи или неподдерживаемая версия")
+        start = HEADER.size + path_size
+        level_path = data[HEADER.size:start].decode("utf-8") or None
+        ticks = bytearray()
+        for bits, run in RUN.iter_unpack(data[start:]):
+            ticks += bytes((bits,)) * run
+        if len(ticks) != count:
+            raise ValueError(f"{path}: запись повреждена ({len(ticks)} тиков вместо {count})")
+        return cls(seed, ticks, sim_hz, level_path, digest.hex() if level_path else None)
+
+    def check_level(self):
+        """Путь к уровню записи; ValueError, если файлы уровня с тех пор изменились."""
+        if self.level_path and LevelFile(self.level_path).digest() != self.level_digest:
+            raise ValueError(f"{self.level_path}: уровень изменился после записи, повтор разойдётся")
+        return self.level_path
+
+
+class InputRecorder:
+    """Источник ввода-обёртка: передаёт ввод дальше и записывает его по тикам."""
+
+    def __init__(self, source, seed, level_path=None):
+        self.source = source
+        self.recording = Recording(seed, level_path=level_path)
+
+    def read(self):
+        state = self.source.read()
+        self.recording.ticks.append(to_bits(state))
+        return state
+
+
+class ReplayInput:
+    """Источник ввода, воспроизводящий запись тик за тиком."""
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.index = 0
+
+    @property
+    def finished(self):
+        return self.index >= len(self.recording)
+
+    def read(self):
+        if self.finished:
+            return NO_INPUT
+        bits = self.recording.ticks[self.index]
+        self.index += 1
+        return from_bits(bits)
+
+
+def run_fast(recording):
+    """Прогон записи без отрисовки с максимальной скоростью."""
+    from headless import HeadlessGame
+
+    game = HeadlessGame(ReplayInput(recording), seed=recording.seed, level_path=recording.check_level())
+    start = time.perf_counter()
+    ticks = game.run(len(recording))
+    elapsed = time.perf_counter() - start
+    print(f"{ticks}/{len(recording)} ticks in {elapsed:.3f}s, "
+          f"player at {game.player.rect.topleft}, dead={game.dead}")
+    return game
+
+
+def run_rendered(recording, speed):
+    """Воспроизведение в окне, в speed раз быстрее реального времени."""
+    from headless import HeadlessGame
+    from main import Camera
+
+    level_path = recording.check_level()
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    pygame.display.set_caption(f"Replay x{speed}")
+    clock = pygame.time.Clock()
+
+    source = ReplayInput(recording)
+    game = HeadlessGame(source, seed=recording.seed, load_sprites=True, level_path=level_path)
+    camera = Camera(800, 600)
+    timestep = FixedTimestep(max_steps=max(1, int(5 * speed)))
+
+    while not source.finished and not game.dead:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                source.index = len(recording)
+
+        for _ in range(timestep.advance(clock.tick(60) * speed)):
+            if source.finished or not game.step():
+                break
+
+        alpha = timestep.alpha
+        camera.update(game.player, alpha)
+        screen.fill((0, 0, 0))
+        game.level.draw(screen, camera, alpha)
+        game.player.draw(screen, camera, alpha)
+        pygame.display.flip()
+
+    pygame.quit()
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанного забега")
+    parser.add_argument("path", help="файл записи (.rpl)")
+    parser.add_argument("--speed", type=float, default=1.0, help="ускорение воспроизведения")
+    parser.add_argument("--no-render", action="store_true", help="без окна, с максимальной скоростью")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.path)
+    if args.no_render:
+        run_fast(recording)
+    else:
+        run_rendered(recording, args.speed)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
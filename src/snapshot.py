@@ -0,0 +1,134 @@
+# snapshot.py
+"""Снимок состояния симуляции в компактный двоичный блок и восстановление из него.
+
+В снимок входит всё, что меняется по ходу забега: физика и анимация игрока,
+частицы (вместе с их генератором), актёры, время уровня и общих часов
+анимаций, состояние глобального random. Уровень и игрок не пересоздаются:
+restore() переписывает поля уже существующих объектов, поэтому рестарт,
+контрольные точки и перемотка не трогают диск и не перестраивают уровень.
+Состояние источника ввода (сценарий, запись) в снимок не входит.
+"""
+import random
+import struct
+import numpy as np
+from animation import CLOCK
+
+MAGIC = b"PFSS"
+VERSION = 1
+# magic, версия
+HEADER = struct.Struct("<4sB")
+# время уровня, предыдущее время уровня, часы анимаций
+WORLD = struct.Struct("<ddd")
+# Mersenne Twister: 624 слова + позиция, затем gauss_next (флаг и значение)
+RANDOM = struct.Struct("<625I?d")
+# x, y, vel_x, vel_y, prev_x, prev_y, sim_time, jump_start_time,
+# jump_held, on_ground, on_wall, wall_side, jump_count, dash_cooldown,
+# is_dashing, dash_timer, facing_right, last_dir, health, rect.x, rect.y,
+# номер состояния анимации, начало анимации на часах
+PLAYER = struct.Struct("<8d ??? bb h ? h ? b i ii B d")
+# число частиц, размер палитры; палитра — по 3 байта на цвет
+PARTICLES = struct.Struct("<IB")
+COLOR = struct.Struct("<3B")
+# PCG64 генератора частиц: state, inc, has_uint32, uinteger
+PCG64 = struct.Struct("<16s16s?I")
+# число актёров
+ACTORS = struct.Struct("<I")
+
+
+def _pack_columns(out, columns, count):
+    for column in columns:
+        out += column[:count].tobytes()
+
+
+def _unpack_columns(data, offset, columns, count):
+    for column in columns:
+        size = count * column.itemsize
+        column[:count] = np.frombuffer(data, dtype=column.dtype, count=count, offset=offset)
+        offset += size
+    return offset
+
+
+def snapshot(level, player):
+    """Состояние уровня и игрока как bytes."""
+    out = bytearray(HEADER.pack(MAGIC, VERSION))
+    out += WORLD.pack(level.time, level.prev_time, CLOCK.time)
+
+    _, words, gauss = random.getstate()
+    out += RANDOM.pack(*words, gauss is not None, gauss or 0.0)
+
+    p = player
+    states = list(p.animations)
+    out += PLAYER.pack(
+        p.x, p.y, p.vel_x, p.vel_y, p.prev_x, p.prev_y, p.sim_time, p.jump_start_time,
+        p.jump_held, p.on_ground, p.on_wall, p.wall_side, p.jump_count, p.dash_cooldown,
+        p.is_dashing, p.dash_timer, p.facing_right, getattr(p, "last_dir", 0), p.health,
+        p.rect.x, p.rect.y, states.index(p.state), p.current_animation.start)
+
+    pool = p.particles
+    out += PARTICLES.pack(pool.count, len(pool.palette))
+    for color in pool.palette:
+        out += COLOR.pack(*color)
+    rng = pool.rng.bit_generator.state
+    out += PCG64.pack(rng["state"]["state"].to_bytes(16, "little"),
+                      rng["state"]["inc"].to_bytes(16, "little"),
+                      bool(rng["has_uint32"]), rng["uinteger"])
+    _pack_columns(out, pool.columns(), pool.count)
+
+    actors = level.actors
+    out += ACTORS.pack(actors.count)
+    _pack_columns(out, actors.columns(), actors.count)
+    return bytes(out)
+
+
+def restore(data, level, player):
+    """Возвращает уровень и игрока (созданных для того же уровня) в состояние из снимка."""
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("не снимок состояния или неподдерживаемая версия")
+    offset = HEADER.size
+
+    level.time, level.prev_time, CLOCK.time = WORLD.unpack_from(data, offset)
+    offset += WORLD.size
+
+    fields = RANDOM.unpack_from(data, offset)
+    offset += RANDOM.size
+    random.setstate((3, fields[:625], fields[626] if fields[625] else None))
+
+    p = player
+    (p.x, p.y, p.vel_x, p.vel_y, p.prev_x, p.prev_y, p.sim_time, p.jump_start_time,
+     p.jump_held, p.on_ground, p.on_wall, p.wall_side, p.jump_count, p.dash_cooldown,
+     p.is_dashing, p.dash_timer, p.facing_right, p.last_dir, p.health,
+     p.rect.x, p.rect.y, state, anim_start) = PLAYER.unpack_from(data, offset)
+    offset += PLAYER.size
+    p.state = list(p.animations)[state]
+    p.current_animation = p.animations[p.state]
+    p.current_animation.start = anim_start
+    p.image = p.current_animation.get_current_frame(not p.facing_right)
+
+    pool = p.particles
+    count, colors = PARTICLES.unpack_from(data, offset)
+    offset += PARTICLES.size
+    if count > pool.capacity:
+        raise ValueError(f"в снимке {count} частиц, а пул вмещает {pool.capacity}")
+    pool.palette = [COLOR.unpack_from(data, offset + i * COLOR.size) for i in range(colors)]
+    offset += colors * COLOR.size
+    state, inc, has_uint32, uinteger = PCG64.unpack_from(data, offset)
+    offset += PCG64.size
+    pool.rng.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": int.from_bytes(state, "little"), "inc": int.from_bytes(inc, "little")},
+        "has_uint32": int(has_uint32),
+        "uinteger": uinteger,
+    }
+    offset = _unpack_columns(data, offset, pool.columns(), count)
+    pool.count = count
+
+    actors = level.actors
+    (count,) = ACTORS.unpack_from(data, offset)
+    offset += ACTORS.size
+    if count > actors.capacity:
+        raise ValueError(f"в снимке {count} актёров, а пул вмещает {actors.capacity}")
+    _unpack_columns(data, offset, actors.columns(), count)
+    actors.count = count
+    # Потоковый уровень подгружает чанки вокруг восстановленной позиции
+    level.stream_around(player.x)
\ No newline at end of file
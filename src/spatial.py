@@ -0,0 +1,102 @@
+# spatial.py
+import numpy as np
+
+# Размер ячейки сетки в пикселях (порядка размера игрока и платформ)
+DEFAULT_CELL_SIZE = 128
+
+# Смещение координат ячейки при упаковке пары (cx, cy) в одно целое
+_CELL_OFFSET = 1 << 20
+
+
+def cell_key(cx, cy):
+    """Ключ ячейки одним int64; работает и для массивов NumPy."""
+    return ((np.asarray(cx, dtype=np.int64) + _CELL_OFFSET) << 32) | (np.asarray(cy, dtype=np.int64) + _CELL_OFFSET)
+
+
+class SpatialHash:
+    """Пространственный хеш прямоугольников на равномерной сетке.
+
+    Каждый прямоугольник регистрируется во всех ячейках, которые он задевает.
+    query(rect) возвращает кандидатов только из ячеек под rect, поэтому
+    стоимость запроса не зависит от общего числа платформ в уровне.
+    Кандидаты возвращаются в порядке добавления — так же, как в обычном списке.
+    """
+
+    def __init__(self, rects=(), cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.rects = {}
+        self.next_id = 0
+        self.table = None
+        for rect in rects:
+            self.add(rect)
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __iter__(self):
+        return iter(self.rects.values())
+
+    def _cell_range(self, rect):
+        cs = self.cell_size
+        return (rect.left // cs, (rect.right - 1) // cs,
+                rect.top // cs, (rect.bottom - 1) // cs)
+
+    def add(self, rect):
+        """Добавляет прямоугольник, возвращает его id для последующего удаления."""
+        rect_id = self.next_id
+        self.next_id += 1
+        self.table = None
+        self.rects[rect_id] = rect
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self.cells.setdefault((cx, cy), []).append(rect_id)
+        return rect_id
+
+    def remove(self, rect_id):
+        rect = self.rects.pop(rect_id)
+        self.table = None
+        x0, x1, y0, y1 = self._cell_range(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self.cells[(cx, cy)]
+                cell.remove(rect_id)
+                if not cell:
+                    del self.cells[(cx, cy)]
+
+    def query_ids(self, rect):
+        x0, x1, y0, y1 = self._cell_range(rect)
+        cells = self.cells
+        if x0 == x1 and y0 == y1:
+            return cells.get((x0, y0), [])
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        return sorted(found)
+
+    def query(self, rect):
+        """Прямоугольники из ячеек, которые задевает rect (кандидаты на пересечение)."""
+        rects = self.rects
+        return [rects[rect_id] for rect_id in self.query_ids(rect)]
+
+    def cell_table(self):
+        """Все ячейки плоскими массивами — для векторных запросов сразу по многим
+        объектам: (ключи ячеек по возрастанию, начало каждой ячейки в записях + конец,
+        записи: left, top, right, bottom). Пересобирается только после add/remove."""
+        if self.table is None:
+            keys = sorted(self.cells)
+            starts = np.zeros(len(keys) + 1, dtype=np.int64)
+            entries = []
+            for i, key in enumerate(keys):
+                for rect_id in self.cells[key]:
+                    rect = self.rects[rect_id]
+                    entries.append((rect.left, rect.top, rect.right, rect.bottom))
+                starts[i + 1] = len(entries)
+            packed = cell_key([cx for cx, _ in keys], [cy for _, cy in keys])
+            bounds = np.array(entries, dtype=np.int32).reshape(-1, 4).T
+            self.table = (packed, starts, bounds)
+        return self.table
\ No newline at end of file
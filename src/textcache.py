@@ -0,0 +1,62 @@
+# textcache.py
+import pygame
+from collections import OrderedDict
+
+_fonts = {}
+
+
+def get_font(name, size):
+    """Шрифт создаётся один раз на (имя, размер); name=None — шрифт pygame по умолчанию."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(name, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU-кеш отрисованных строк по ключу (шрифт, текст, цвет, сглаживание)."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+# Общий кеш для меню и экранов
+TEXT = TextCache()
+
+
+class TextLabel:
+    """Надпись HUD: перерисовывает текст только когда он изменился.
+
+    Часто меняющиеся значения (таймер, здоровье) не засоряют общий TEXT.
+    """
+
+    def __init__(self, font, color, antialias=True):
+        self.font = font
+        self.color = color
+        self.antialias = antialias
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, self.antialias, self.color)
+        return self.surface
\ No newline at end of file
@@ -0,0 +1,41 @@
+# timestep.py
+
+# Частота симуляции: физика игрока считается в «кадрах» по 1/60 секунды
+SIM_HZ = 60
+SIM_DT_MS = 1000.0 / SIM_HZ
+
+# Сколько шагов физики максимум догоняем за один кадр отрисовки.
+# Если кадр был ещё дольше, лишнее время отбрасывается (игра замедляется,
+# но не уходит в «спираль смерти»).
+MAX_CATCHUP_STEPS = 5
+
+
+class FixedTimestep:
+    """Аккумулятор времени для фиксированного шага симуляции.
+
+    advance(frame_ms) возвращает, сколько тиков физики нужно выполнить за
+    этот кадр; alpha — доля следующего тика, уже прошедшая в реальном
+    времени (0..1), по ней отрисовка интерполирует между двумя состояниями.
+    """
+
+    def __init__(self, hz=SIM_HZ, max_steps=MAX_CATCHUP_STEPS):
+        self.dt_ms = 1000.0 / hz
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, frame_ms):
+        self.accumulator += frame_ms
+        steps = int(self.accumulator // self.dt_ms)
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt_ms
+        return steps
+
+    @property
+    def alpha(self):
+        return self.accumulator / self.dt_ms
\ No newline at end of file